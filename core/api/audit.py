@@ -2,24 +2,14 @@
 import logging
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
-import psycopg2
-from psycopg2.extras import RealDictCursor
 
-from config import settings
+import database
 from models.schemas import AuditLogEntry, AuditLogResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_db_connection():
-    """Create a database connection."""
-    return psycopg2.connect(
-        settings.database_url,
-        cursor_factory=RealDictCursor
-    )
-
-
 @router.get("/audit-log", response_model=AuditLogResponse)
 async def get_audit_log(
     tenant_id: str = Query(..., description="Tenant identifier"),
@@ -45,9 +35,8 @@ async def get_audit_log(
         AuditLogResponse: List of audit log entries with total count
     """
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
                 # Build query with filters
                 query = "SELECT * FROM audit_log WHERE tenant_id = %s"
                 params = [tenant_id]
@@ -62,21 +51,19 @@ async def get_audit_log(
 
                 # Get total count
                 count_query = query.replace("SELECT *", "SELECT COUNT(*)")
-                cur.execute(count_query, params)
-                total = cur.fetchone()["count"]
+                await cur.execute(count_query, params)
+                total = (await cur.fetchone())["count"]
 
                 # Get paginated results
                 query += " ORDER BY timestamp DESC LIMIT %s OFFSET %s"
                 params.extend([limit, offset])
-                cur.execute(query, params)
-                entries = cur.fetchall()
+                await cur.execute(query, params)
+                entries = await cur.fetchall()
 
                 return AuditLogResponse(
                     total=total,
                     entries=[AuditLogEntry(**entry) for entry in entries]
                 )
-        finally:
-            conn.close()
 
     except Exception as e:
         logger.error(f"Failed to retrieve audit log: {e}", exc_info=True)
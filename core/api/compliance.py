@@ -2,24 +2,14 @@
 import logging
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query
-import psycopg2
-from psycopg2.extras import RealDictCursor
 
-from config import settings
+import database
 from models.schemas import ComplianceReport
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_db_connection():
-    """Create a database connection."""
-    return psycopg2.connect(
-        settings.database_url,
-        cursor_factory=RealDictCursor
-    )
-
-
 @router.get("/compliance/report", response_model=ComplianceReport)
 async def generate_compliance_report(
     tenant_id: str = Query(..., description="Tenant identifier")
@@ -40,56 +30,55 @@ async def generate_compliance_report(
         ComplianceReport: Comprehensive compliance statistics
     """
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
                 # Count total signals
-                cur.execute(
+                await cur.execute(
                     "SELECT COUNT(*) as count FROM signals WHERE tenant_id = %s",
                     (tenant_id,)
                 )
-                total_signals = cur.fetchone()["count"]
+                total_signals = (await cur.fetchone())["count"]
 
                 # Count PII anonymizations
-                cur.execute(
+                await cur.execute(
                     "SELECT COUNT(*) as count FROM pseudonym_mapping WHERE tenant_id = %s",
                     (tenant_id,)
                 )
-                pii_anonymized = cur.fetchone()["count"]
+                pii_anonymized = (await cur.fetchone())["count"]
 
                 # Count audit entries
-                cur.execute(
+                await cur.execute(
                     "SELECT COUNT(*) as count FROM audit_log WHERE tenant_id = %s",
                     (tenant_id,)
                 )
-                audit_entries = cur.fetchone()["count"]
+                audit_entries = (await cur.fetchone())["count"]
 
                 # Get category breakdown
-                cur.execute(
+                await cur.execute(
                     """
                     SELECT category, COUNT(*) as count
                     FROM signals
-                    WHERE tenant_id = %s
+                    WHERE tenant_id = %s AND analysis_status = 'done'
                     GROUP BY category
                     """,
                     (tenant_id,)
                 )
-                category_stats = {row["category"]: row["count"] for row in cur.fetchall()}
+                category_stats = {row["category"]: row["count"] for row in await cur.fetchall()}
 
                 # Get urgency breakdown
-                cur.execute(
+                await cur.execute(
                     """
                     SELECT urgency, COUNT(*) as count
                     FROM signals
-                    WHERE tenant_id = %s
+                    WHERE tenant_id = %s AND analysis_status = 'done'
                     GROUP BY urgency
                     """,
                     (tenant_id,)
                 )
-                urgency_stats = {row["urgency"]: row["count"] for row in cur.fetchall()}
+                urgency_stats = {row["urgency"]: row["count"] for row in await cur.fetchall()}
 
                 # Get PII type breakdown
-                cur.execute(
+                await cur.execute(
                     """
                     SELECT pii_type, COUNT(*) as count
                     FROM pseudonym_mapping
@@ -98,7 +87,7 @@ async def generate_compliance_report(
                     """,
                     (tenant_id,)
                 )
-                pii_type_stats = {row["pii_type"]: row["count"] for row in cur.fetchall()}
+                pii_type_stats = {row["pii_type"]: row["count"] for row in await cur.fetchall()}
 
                 # Determine compliance status
                 compliance_status = "compliant"
@@ -122,8 +111,6 @@ async def generate_compliance_report(
                         "audit_coverage": round(audit_entries / max(total_signals, 1), 2)
                     }
                 )
-        finally:
-            conn.close()
 
     except Exception as e:
         logger.error(f"Failed to generate compliance report: {e}", exc_info=True)
@@ -1,11 +1,16 @@
 """Health check endpoint."""
 import logging
 from fastapi import APIRouter, HTTPException
-import psycopg2
-import httpx
-
+import database
 from config import settings
+from llm_client import get_client
+from pipeline import analysis_jobs
+from pipeline.analysis_cache import analysis_cache
+from pipeline.analyzer import tier_stats
+from pipeline.circuit_breaker import CLOSED, ollama_breaker
+from pipeline.llm_dispatcher import llm_dispatcher
 from models.schemas import HealthResponse
+from pipeline.pseudonym_cache import pseudonym_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -28,15 +33,14 @@ async def health_check():
 
     # Check database
     try:
-        conn = psycopg2.connect(settings.database_url)
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1")
-            result = cur.fetchone()
-            if result and result[0] == 1:
-                health_status["database"] = "healthy"
-            else:
-                health_status["database"] = "unhealthy"
-        conn.close()
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT 1 AS ok")
+                result = await cur.fetchone()
+                if result and result["ok"] == 1:
+                    health_status["database"] = "healthy"
+                else:
+                    health_status["database"] = "unhealthy"
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
         health_status["database"] = "unhealthy"
@@ -44,16 +48,31 @@ async def health_check():
 
     # Check Ollama
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.ollama_url}/api/tags")
-            if response.status_code == 200:
-                health_status["ollama"] = "healthy"
-            else:
-                health_status["ollama"] = "unhealthy"
-                health_status["status"] = "degraded"
+        response = await get_client().get("/api/tags", timeout=settings.ollama_health_timeout)
+        if response.status_code == 200:
+            health_status["ollama"] = "healthy"
+        else:
+            health_status["ollama"] = "unhealthy"
+            health_status["status"] = "degraded"
     except Exception as e:
         logger.error(f"Ollama health check failed: {e}")
         health_status["ollama"] = "unhealthy"
         health_status["status"] = "degraded"
 
+    # Offener Breaker: Analysen laufen nur über den Keyword-Fallback
+    health_status["ollama_breaker"] = ollama_breaker.stats()
+    if ollama_breaker.state != CLOSED:
+        health_status["status"] = "degraded"
+
+    health_status["database_pool"] = database.pool_stats()
+    health_status["pseudonym_cache"] = pseudonym_cache.stats()
+    health_status["analysis_cache"] = analysis_cache.stats()
+    health_status["llm_dispatcher"] = llm_dispatcher.stats()
+    health_status["analysis_tiers"] = tier_stats()
+    if health_status["database"] == "healthy":
+        try:
+            health_status["analysis_queue"] = await analysis_jobs.queue_stats()
+        except Exception as e:
+            logger.error(f"Analysis queue stats failed: {e}")
+
     return health_status
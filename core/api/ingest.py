@@ -2,29 +2,22 @@
 import json
 import logging
 import uuid
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from psycopg2.extras import Json
-
-from config import settings
-from models.schemas import IngestRequest, IngestResponse
-from pipeline.detector import detect_pii
-from pipeline.anonymizer import anonymize_content
+from fastapi import APIRouter, HTTPException, Query
+
+import database
+from models.schemas import IngestAcceptedResponse, IngestRequest, IngestResponse, IngestStatusResponse
+from pipeline import analysis_jobs
+from pipeline.detector import detect_pii_async
+from pipeline.anonymizer import apply_pseudonyms, plan_pseudonyms, pseudonym_values
 from pipeline.analyzer import analyze_content
-from pipeline.audit_logger import log_audit_event
+from pipeline.unit_of_work import commit_ingest
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_db_connection():
-    """Create a database connection."""
-    return psycopg2.connect(
-        settings.database_url,
-        cursor_factory=RealDictCursor
-    )
+def _preview(anonymized_content: str) -> str:
+    return anonymized_content[:200] + "..." if len(anonymized_content) > 200 else anonymized_content
 
 
 @router.post("/ingest", response_model=IngestResponse)
@@ -36,8 +29,8 @@ async def ingest_feedback(request: IngestRequest):
     1. Detect PII in the content
     2. Pseudonymize detected PII
     3. Analyze anonymized content with LLM
-    4. Store signal in database
-    5. Log audit trail
+    4. Store pseudonyms and signal in database
+    5. Log audit trail (same transaction as step 4)
 
     Args:
         request: IngestRequest containing tenant_id, content, source, and metadata
@@ -51,61 +44,34 @@ async def ingest_feedback(request: IngestRequest):
         logger.info(f"Processing feedback for tenant {request.tenant_id}, signal {signal_id}")
 
         # Step 1: Detect PII
-        pii_detections = detect_pii(request.content)
+        pii_detections = await detect_pii_async(request.content, request.tenant_id)
         logger.info(f"Detected {len(pii_detections)} PII entities")
 
-        # Step 2: Anonymize content
-        anonymized_content, pseudonym_mappings = anonymize_content(
+        # Step 2: Pseudonymize detected PII (neue Mappings werden erst in Step 4 geschrieben)
+        plan = await plan_pseudonyms(pseudonym_values(pii_detections), request.tenant_id)
+        anonymized_content, pseudonym_mappings = apply_pseudonyms(
             request.content,
             pii_detections,
-            request.tenant_id
+            plan.pseudonyms
         )
         logger.info(f"Anonymized content with {len(pseudonym_mappings)} pseudonyms")
 
         # Step 3: Analyze with LLM
-        analysis = await analyze_content(anonymized_content)
+        analysis = await analyze_content(anonymized_content, request.tenant_id)
         logger.info(f"Analysis complete: category={analysis.category}, urgency={analysis.urgency}")
 
-        # Step 4: Store signal in database
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO signals
-                    (tenant_id, signal_id, category, urgency, sentiment, anonymized_content, metadata, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (
-                    request.tenant_id,
-                    signal_id,
-                    analysis.category,
-                    analysis.urgency,
-                    analysis.sentiment,
-                    anonymized_content,
-                    Json({
-                        "source": request.source,
-                        "pii_count": len(pii_detections),
-                        "original_metadata": request.metadata,
-                        "summary": analysis.summary
-                    }),
-                    datetime.utcnow(),
-                    datetime.utcnow()
-                ))
-                conn.commit()
-                logger.info(f"Signal {signal_id} stored in database")
-        finally:
-            conn.close()
-
-        # Step 5: Log audit event
-        await log_audit_event(
-            tenant_id=request.tenant_id,
-            signal_id=signal_id,
-            action="INGEST",
-            actor="system",
-            details={
+        # Step 4 + 5: Pseudonyme, Signal und Audit-Eintrag in einer Transaktion
+        anonymized_content = await commit_ingest(
+            request,
+            signal_id,
+            pii_detections,
+            plan,
+            anonymized_content,
+            analysis,
+            audit_details={
                 "source": request.source,
                 "pii_detected": len(pii_detections),
-                "pii_types": list(set(p["type"] for p in pii_detections)),
+                "pii_types": pii_detections.types,
                 "category": analysis.category,
                 "urgency": analysis.urgency
             }
@@ -119,9 +85,113 @@ async def ingest_feedback(request: IngestRequest):
             category=analysis.category,
             urgency=analysis.urgency,
             sentiment=analysis.sentiment,
-            anonymized_preview=anonymized_content[:200] + "..." if len(anonymized_content) > 200 else anonymized_content
+            anonymized_preview=_preview(anonymized_content)
         )
 
     except Exception as e:
         logger.error(f"Failed to process feedback: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+
+@router.post("/ingest/async", response_model=IngestAcceptedResponse, status_code=202)
+async def ingest_feedback_async(request: IngestRequest):
+    """
+    Ingest customer feedback without waiting for the LLM.
+
+    PII detection and pseudonymization run synchronously; the signal is stored
+    with ``analysis_status=pending`` and an analysis job is queued in the same
+    transaction. A worker fills in category, urgency, sentiment and summary
+    later – poll ``status_url`` for the result.
+
+    Args:
+        request: IngestRequest containing tenant_id, content, source, and metadata
+
+    Returns:
+        IngestAcceptedResponse: signal_id and status URL (HTTP 202)
+    """
+    try:
+        signal_id = f"sig_{uuid.uuid4().hex[:12]}"
+        logger.info(f"Queueing feedback for tenant {request.tenant_id}, signal {signal_id}")
+
+        pii_detections = await detect_pii_async(request.content, request.tenant_id)
+        plan = await plan_pseudonyms(pseudonym_values(pii_detections), request.tenant_id)
+        anonymized_content, _ = apply_pseudonyms(request.content, pii_detections, plan.pseudonyms)
+
+        anonymized_content = await commit_ingest(
+            request,
+            signal_id,
+            pii_detections,
+            plan,
+            anonymized_content,
+            None,
+            audit_details={
+                "source": request.source,
+                "pii_detected": len(pii_detections),
+                "pii_types": pii_detections.types,
+                "analysis": "queued"
+            }
+        )
+        analysis_jobs.notify()
+
+        return IngestAcceptedResponse(
+            signal_id=signal_id,
+            pii_detected=len(pii_detections),
+            anonymized_preview=_preview(anonymized_content),
+            status_url=f"/api/v1/ingest/{signal_id}/status?tenant_id={request.tenant_id}"
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to queue feedback: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+
+@router.get("/ingest/{signal_id}/status", response_model=IngestStatusResponse)
+async def ingest_status(
+    signal_id: str,
+    tenant_id: str = Query(..., description="Tenant identifier")
+):
+    """
+    Report the analysis progress of an ingested signal.
+
+    Args:
+        signal_id: Signal ID returned by the ingest endpoint
+        tenant_id: Tenant identifier for authorization
+
+    Returns:
+        IngestStatusResponse: queued/running/failed with attempts, or done with the analysis
+    """
+    try:
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT s.category, s.urgency, s.sentiment, s.metadata, s.analysis_status,
+                           j.status AS job_status, j.attempts, j.last_error
+                    FROM signals s
+                    LEFT JOIN analysis_jobs j ON j.signal_id = s.signal_id
+                    WHERE s.signal_id = %s AND s.tenant_id = %s
+                    """,
+                    (signal_id, tenant_id)
+                )
+                row = await cur.fetchone()
+    except Exception as e:
+        logger.error(f"Failed to retrieve ingest status: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve status: {str(e)}")
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Signal not found")
+
+    # Erledigte Jobs werden gelöscht – ohne Job-Zeile zählt der Signal-Status
+    status = row["job_status"] or row["analysis_status"]
+    response = IngestStatusResponse(
+        signal_id=signal_id,
+        status=status,
+        attempts=row["attempts"] or 0,
+        last_error=row["last_error"]
+    )
+    if status == "done":
+        response.category = row["category"]
+        response.urgency = row["urgency"]
+        response.sentiment = float(row["sentiment"]) if row["sentiment"] is not None else None
+        response.summary = (row["metadata"] or {}).get("summary")
+    return response
@@ -2,24 +2,14 @@
 import logging
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
-import psycopg2
-from psycopg2.extras import RealDictCursor
 
-from config import settings
+import database
 from models.schemas import Signal, SignalListResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def get_db_connection():
-    """Create a database connection."""
-    return psycopg2.connect(
-        settings.database_url,
-        cursor_factory=RealDictCursor
-    )
-
-
 @router.get("/signals", response_model=SignalListResponse)
 async def list_signals(
     tenant_id: str = Query(..., description="Tenant identifier"),
@@ -42,9 +32,8 @@ async def list_signals(
         SignalListResponse: List of signals with total count
     """
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
                 # Build query with filters
                 query = "SELECT * FROM signals WHERE tenant_id = %s"
                 params = [tenant_id]
@@ -59,21 +48,19 @@ async def list_signals(
 
                 # Get total count
                 count_query = query.replace("SELECT *", "SELECT COUNT(*)")
-                cur.execute(count_query, params)
-                total = cur.fetchone()["count"]
+                await cur.execute(count_query, params)
+                total = (await cur.fetchone())["count"]
 
                 # Get paginated results
                 query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
                 params.extend([limit, offset])
-                cur.execute(query, params)
-                signals = cur.fetchall()
+                await cur.execute(query, params)
+                signals = await cur.fetchall()
 
                 return SignalListResponse(
                     total=total,
                     signals=[Signal(**signal) for signal in signals]
                 )
-        finally:
-            conn.close()
 
     except Exception as e:
         logger.error(f"Failed to retrieve signals: {e}", exc_info=True)
@@ -99,14 +86,13 @@ async def get_signal(
         HTTPException: If signal not found or access denied
     """
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
                     "SELECT * FROM signals WHERE signal_id = %s AND tenant_id = %s",
                     (signal_id, tenant_id)
                 )
-                signal = cur.fetchone()
+                signal = (await cur.fetchone())
 
                 if not signal:
                     raise HTTPException(
@@ -115,8 +101,6 @@ async def get_signal(
                     )
 
                 return Signal(**signal)
-        finally:
-            conn.close()
 
     except HTTPException:
         raise
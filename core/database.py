@@ -0,0 +1,100 @@
+"""Async data access: the one psycopg 3 connection pool shared by the API, pipeline and jobs."""
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[AsyncConnectionPool] = None
+
+
+async def open_pool():
+    """Open the process-wide pool (called from the ``main.lifespan`` startup hook)."""
+    global _pool
+    if _pool is not None:
+        return
+    pool = AsyncConnectionPool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        kwargs={"row_factory": dict_row},
+        timeout=settings.db_pool_timeout,
+        max_idle=settings.db_pool_max_idle,
+        max_lifetime=settings.db_pool_max_lifetime,
+        max_waiting=settings.db_pool_max_waiting,
+        name="clawbot",
+        open=False,
+    )
+    await pool.open(wait=True)
+    _pool = pool
+    logger.info(
+        f"Datenbank-Pool geöffnet: {settings.db_pool_min_size}-{settings.db_pool_max_size} Verbindungen"
+    )
+
+
+async def close_pool():
+    """Close the pool on shutdown; open connections are returned first."""
+    global _pool
+    if _pool is None:
+        return
+    pool, _pool = _pool, None
+    await pool.close()
+    logger.info("Datenbank-Pool geschlossen")
+
+
+@asynccontextmanager
+async def connection() -> AsyncIterator[AsyncConnection]:
+    """
+    Borrow a pooled connection.
+
+    Der Block läuft in einer Transaktion: ohne Fehler wird beim Verlassen
+    committet, bei einer Exception zurückgerollt. Rows kommen als dict
+    (wie ``RealDictCursor``).
+
+    Yields:
+        AsyncConnection with ``dict_row`` row factory
+
+    Raises:
+        psycopg_pool.PoolTimeout: Keine Verbindung innerhalb ``db_pool_timeout``
+    """
+    if _pool is None:
+        raise RuntimeError("Datenbank-Pool ist nicht geöffnet (open_pool() im Startup aufrufen)")
+    async with _pool.connection() as conn:
+        yield conn
+
+
+def pool_stats() -> Optional[Dict[str, Any]]:
+    """
+    Pool-Kennzahlen für Health/Monitoring.
+
+    ``in_use``/``saturation`` zeigen die Auslastung, ``requests_waiting`` die
+    aktuelle Warteschlange; die ``requests_*``-Zähler laufen seit dem Start.
+
+    Returns:
+        Kennzahlen oder None, wenn der Pool nicht geöffnet ist
+    """
+    if _pool is None:
+        return None
+    stats = _pool.get_stats()
+    size = stats.get("pool_size", 0)
+    in_use = size - stats.get("pool_available", 0)
+    return {
+        "min_size": stats.get("pool_min", 0),
+        "max_size": stats.get("pool_max", 0),
+        "size": size,
+        "in_use": in_use,
+        "saturation": round(in_use / _pool.max_size, 4) if _pool.max_size else 0.0,
+        "requests_waiting": stats.get("requests_waiting", 0),
+        "requests": stats.get("requests_num", 0),
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_wait_ms": stats.get("requests_wait_ms", 0),
+        "requests_errors": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
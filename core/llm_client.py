@@ -0,0 +1,59 @@
+"""Shared Ollama HTTP client: one keep-alive connection pool per process."""
+import logging
+from typing import Optional
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def open_client():
+    """Create the process-wide client (called from the ``main.lifespan`` startup hook)."""
+    global _client
+    if _client is not None:
+        return
+    _client = httpx.AsyncClient(
+        base_url=settings.ollama_url,
+        timeout=httpx.Timeout(
+            settings.ollama_timeout,
+            connect=settings.ollama_connect_timeout,
+            pool=settings.ollama_pool_timeout,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.ollama_max_connections,
+            max_keepalive_connections=settings.ollama_max_keepalive,
+            keepalive_expiry=settings.ollama_keepalive_expiry,
+        ),
+    )
+    logger.info(
+        f"Ollama-Client geöffnet: {settings.ollama_url}, "
+        f"max. {settings.ollama_max_connections} Verbindungen"
+    )
+
+
+async def close_client():
+    """Close the client and its pooled connections on shutdown."""
+    global _client
+    if _client is None:
+        return
+    client, _client = _client, None
+    await client.aclose()
+    logger.info("Ollama-Client geschlossen")
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Shared client for all Ollama calls (analyzer, health checks).
+
+    Pfade relativ zu ``OLLAMA_URL`` angeben, z. B. ``/api/generate``.
+
+    Returns:
+        httpx.AsyncClient with keep-alive pool and timeouts from Settings
+    """
+    if _client is None:
+        raise RuntimeError("Ollama-Client ist nicht geöffnet (open_client() im Startup aufrufen)")
+    return _client
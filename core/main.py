@@ -3,11 +3,14 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import psycopg2
-from psycopg2.extras import RealDictCursor
 
 from config import settings
 from api import health, ingest, signals, audit, compliance
+import database
+import llm_client
+from pipeline import analysis_jobs
+from pipeline.circuit_breaker import ollama_breaker
+from pipeline.detector import shutdown_detector_pool, start_detector_pool
 
 
 # Configure logging
@@ -18,79 +21,125 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def get_db_connection():
-    """Create a database connection."""
-    return psycopg2.connect(
-        settings.database_url,
-        cursor_factory=RealDictCursor
-    )
-
-
-def init_database():
+async def init_database():
     """Initialize database schema."""
     logger.info("Initializing database schema...")
 
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            # Create signals table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS signals (
-                    id SERIAL PRIMARY KEY,
-                    tenant_id VARCHAR(255) NOT NULL,
-                    signal_id VARCHAR(255) UNIQUE NOT NULL,
-                    category VARCHAR(100),
-                    urgency VARCHAR(50),
-                    sentiment VARCHAR(50),
-                    anonymized_content TEXT,
-                    metadata JSONB,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                # Create signals table
+                await cur.execute("""
+                    CREATE TABLE IF NOT EXISTS signals (
+                        id SERIAL PRIMARY KEY,
+                        tenant_id VARCHAR(255) NOT NULL,
+                        signal_id VARCHAR(255) UNIQUE NOT NULL,
+                        category VARCHAR(100),
+                        urgency VARCHAR(50),
+                        sentiment VARCHAR(50),
+                        anonymized_content TEXT,
+                        metadata JSONB,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Create audit_log table
+                await cur.execute("""
+                    CREATE TABLE IF NOT EXISTS audit_log (
+                        id SERIAL PRIMARY KEY,
+                        tenant_id VARCHAR(255) NOT NULL,
+                        signal_id VARCHAR(255),
+                        action VARCHAR(100) NOT NULL,
+                        actor VARCHAR(255),
+                        details JSONB,
+                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Create pseudonym_mapping table
+                await cur.execute("""
+                    CREATE TABLE IF NOT EXISTS pseudonym_mapping (
+                        id SERIAL PRIMARY KEY,
+                        tenant_id VARCHAR(255) NOT NULL,
+                        original_hash VARCHAR(255) NOT NULL,
+                        pseudonym VARCHAR(255) NOT NULL,
+                        pii_type VARCHAR(50) NOT NULL,
+                        encrypted_original TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(tenant_id, original_hash)
+                    )
+                """)
+
+                # Envelope-Verschlüsselung: Datenschlüssel pro Tenant, mit dem
+                # Master-Key verpackt; key_version 0 = Altbestand (Master-Key direkt)
+                await cur.execute("""
+                    CREATE TABLE IF NOT EXISTS tenant_keys (
+                        tenant_id VARCHAR(255) NOT NULL,
+                        key_version INTEGER NOT NULL,
+                        wrapped_key TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        retired_at TIMESTAMP,
+                        PRIMARY KEY (tenant_id, key_version)
+                    )
+                """)
+                await cur.execute(
+                    "ALTER TABLE pseudonym_mapping ADD COLUMN IF NOT EXISTS key_version INTEGER NOT NULL DEFAULT 0"
                 )
-            """)
-
-            # Create audit_log table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS audit_log (
-                    id SERIAL PRIMARY KEY,
-                    tenant_id VARCHAR(255) NOT NULL,
-                    signal_id VARCHAR(255),
-                    action VARCHAR(100) NOT NULL,
-                    actor VARCHAR(255),
-                    details JSONB,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+
+                # Analyse-Cache: identische anonymisierte Inhalte nur einmal ans LLM
+                await cur.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_cache (
+                        cache_key CHAR(64) PRIMARY KEY,
+                        model VARCHAR(255) NOT NULL,
+                        prompt_version VARCHAR(50) NOT NULL,
+                        result JSONB NOT NULL,
+                        hits INTEGER NOT NULL DEFAULT 0,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Asynchroner Ingest: Signal zuerst, Analysefelder füllt ein Worker
+                await cur.execute(
+                    "ALTER TABLE signals ADD COLUMN IF NOT EXISTS analysis_status VARCHAR(20) NOT NULL DEFAULT 'done'"
                 )
-            """)
-
-            # Create pseudonym_mapping table
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS pseudonym_mapping (
-                    id SERIAL PRIMARY KEY,
-                    tenant_id VARCHAR(255) NOT NULL,
-                    original_hash VARCHAR(255) NOT NULL,
-                    pseudonym VARCHAR(255) NOT NULL,
-                    pii_type VARCHAR(50) NOT NULL,
-                    encrypted_original TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(tenant_id, original_hash)
+                await cur.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_jobs (
+                        id BIGSERIAL PRIMARY KEY,
+                        signal_id VARCHAR(255) UNIQUE NOT NULL
+                            REFERENCES signals(signal_id) ON DELETE CASCADE,
+                        tenant_id VARCHAR(255) NOT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        last_error TEXT,
+                        run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        locked_until TIMESTAMP,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Create indexes
+                await cur.execute("CREATE INDEX IF NOT EXISTS idx_signals_tenant ON signals(tenant_id)")
+                await cur.execute("CREATE INDEX IF NOT EXISTS idx_signals_created ON signals(created_at)")
+                await cur.execute("CREATE INDEX IF NOT EXISTS idx_audit_tenant ON audit_log(tenant_id)")
+                await cur.execute("CREATE INDEX IF NOT EXISTS idx_audit_signal ON audit_log(signal_id)")
+                await cur.execute("CREATE INDEX IF NOT EXISTS idx_pseudonym_tenant ON pseudonym_mapping(tenant_id)")
+                await cur.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_pseudonym_key_version ON pseudonym_mapping(tenant_id, key_version, id)"
+                )
+                await cur.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_created ON analysis_cache(created_at)")
+                await cur.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_hit ON analysis_cache(last_hit_at)")
+                await cur.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_analysis_jobs_due ON analysis_jobs(status, run_after, id) "
+                    "WHERE status IN ('queued', 'running')"
                 )
-            """)
-
-            # Create indexes
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_signals_tenant ON signals(tenant_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_signals_created ON signals(created_at)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_audit_tenant ON audit_log(tenant_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_audit_signal ON audit_log(signal_id)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_pseudonym_tenant ON pseudonym_mapping(tenant_id)")
 
-            conn.commit()
-            logger.info("Database schema initialized successfully")
+        logger.info("Database schema initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
-        conn.rollback()
         raise
-    finally:
-        conn.close()
 
 
 @asynccontextmanager
@@ -99,7 +148,11 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting ClawBot DSGVO MVP...")
     try:
-        init_database()
+        start_detector_pool()
+        await database.open_pool()
+        await init_database()
+        await llm_client.open_client()
+        analysis_jobs.start_workers(settings.analysis_workers)
         logger.info("ClawBot is ready!")
     except Exception as e:
         logger.error(f"Startup failed: {e}")
@@ -109,6 +162,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down ClawBot...")
+    await analysis_jobs.stop_workers()
+    await ollama_breaker.stop()
+    await llm_client.close_client()
+    await database.close_pool()
+    shutdown_detector_pool()
 
 
 # Create FastAPI app
@@ -40,15 +40,37 @@ class IngestResponse(BaseModel):
     anonymized_preview: str = Field(..., description="Preview of anonymized content")
 
 
+class IngestAcceptedResponse(BaseModel):
+    """Response model for asynchronous ingest (analysis queued)."""
+    signal_id: str = Field(..., description="Generated signal ID")
+    status: str = Field(default="queued", description="Analysis status")
+    pii_detected: int = Field(..., description="Number of PII entities detected")
+    anonymized_preview: str = Field(..., description="Preview of anonymized content")
+    status_url: str = Field(..., description="URL to poll for the analysis status")
+
+
+class IngestStatusResponse(BaseModel):
+    """Response model for the analysis status of an ingested signal."""
+    signal_id: str = Field(..., description="Signal ID")
+    status: str = Field(..., description="queued, running, done or failed")
+    attempts: int = Field(default=0, description="Analysis attempts so far")
+    last_error: Optional[str] = Field(None, description="Error of the last failed attempt")
+    category: Optional[str] = Field(None, description="Categorized feedback type (when done)")
+    urgency: Optional[str] = Field(None, description="Urgency level (when done)")
+    sentiment: Optional[float] = Field(None, description="Sentiment score -1.0 to +1.0 (when done)")
+    summary: Optional[str] = Field(None, description="Brief summary (when done)")
+
+
 class Signal(BaseModel):
     """Model for a processed signal."""
     id: int = Field(..., description="Database ID")
     tenant_id: str = Field(..., description="Tenant identifier")
     signal_id: str = Field(..., description="Unique signal identifier")
-    category: str = Field(..., description="Signal category")
-    urgency: str = Field(..., description="Urgency level")
-    sentiment: float = Field(default=0.0, description="Sentiment score -1.0 to +1.0")
+    category: Optional[str] = Field(None, description="Signal category (None while pending)")
+    urgency: Optional[str] = Field(None, description="Urgency level (None while pending)")
+    sentiment: Optional[float] = Field(default=0.0, description="Sentiment score -1.0 to +1.0 (None while pending)")
     anonymized_content: str = Field(..., description="Anonymized content")
+    analysis_status: str = Field(default="done", description="pending, done or failed")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
@@ -94,3 +116,10 @@ class HealthResponse(BaseModel):
     database: str = Field(..., description="Database connection status")
     ollama: str = Field(..., description="Ollama service status")
     version: str = Field(..., description="Application version")
+    database_pool: Optional[Dict[str, Any]] = Field(None, description="Connection pool metrics (size, in use, saturation, waiting, …)")
+    pseudonym_cache: Optional[Dict[str, Any]] = Field(None, description="Pseudonym cache metrics (size, hit rate, …)")
+    analysis_cache: Optional[Dict[str, Any]] = Field(None, description="LLM analysis cache metrics (memory/DB hits, hit rate, …)")
+    ollama_breaker: Optional[Dict[str, Any]] = Field(None, description="Circuit breaker state (closed/open/half_open) in front of Ollama")
+    llm_dispatcher: Optional[Dict[str, Any]] = Field(None, description="LLM concurrency limit, queue and latency")
+    analysis_tiers: Optional[Dict[str, Any]] = Field(None, description="Analyses decided by keyword classifier, cache, LLM or fallback")
+    analysis_queue: Optional[Dict[str, Any]] = Field(None, description="Async analysis workers and jobs per status")
@@ -0,0 +1,225 @@
+"""Inhaltsadressierter Cache für LLM-Analysen: LRU im Speicher vor einer Postgres-Tabelle."""
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from psycopg.types.json import Jsonb
+
+import database
+from config import settings
+from models.schemas import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Nach so vielen neuen Einträgen wird die Tabelle auf TTL/Maximalgröße gestutzt
+PRUNE_EVERY = 500
+
+
+def normalize(content: str) -> str:
+    """Unicode-NFC, Whitespace zusammengefasst – sonst byte-genau (Pseudonyme bleiben Teil des Schlüssels)."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", content)).strip()
+
+
+def cache_key(model: str, prompt_version: str, anonymized_content: str) -> str:
+    """SHA-256 über Modell, Prompt-Version und normalisierten Inhalt."""
+    material = f"{model}\0{prompt_version}\0{normalize(anonymized_content)}"
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Zweistufiger Cache ``cache_key → AnalysisResult``.
+
+    Stufe 1 ist ein prozesslokales LRU (``memory_size`` Einträge), Stufe 2 die
+    Tabelle ``analysis_cache``, die alle Worker teilen. Einträge verfallen nach
+    ``ttl`` Sekunden; die Tabelle wird zusätzlich auf ``max_rows`` Zeilen
+    (zuletzt genutzte zuerst behalten) gestutzt. Fehler der DB-Stufe werden
+    geloggt und wie ein Miss behandelt – die Analyse läuft dann normal.
+    """
+
+    def __init__(self, memory_size: int, ttl: float = 0.0, max_rows: int = 0):
+        """
+        Args:
+            memory_size: Einträge im Speicher (0 = nur DB-Stufe)
+            ttl: Lebensdauer in Sekunden (0 = kein Ablauf)
+            max_rows: Maximale Zeilen in der Tabelle (0 = unbegrenzt)
+        """
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[str, Tuple[AnalysisResult, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stores_since_prune = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[AnalysisResult]:
+        """Schlägt zuerst im Speicher, dann in der Tabelle nach."""
+        result = self._memory_get(key)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        if settings.analysis_cache_db:
+            row = await self._db_get(key)
+            if row is not None:
+                result, age = row
+                self.db_hits += 1
+                self._memory_put(key, result, time.monotonic() - age)
+                return result.model_copy()
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, result: AnalysisResult, model: str, prompt_version: str):
+        """Speichert eine (echte, nicht Fallback-)Analyse in beiden Stufen."""
+        self._memory_put(key, result, time.monotonic())
+        self.stores += 1
+        if not settings.analysis_cache_db:
+            return
+        try:
+            async with database.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        """
+                        INSERT INTO analysis_cache (cache_key, model, prompt_version, result)
+                        VALUES (%s, %s, %s, %s)
+                        ON CONFLICT (cache_key) DO UPDATE
+                        SET result = EXCLUDED.result, created_at = CURRENT_TIMESTAMP,
+                            last_hit_at = CURRENT_TIMESTAMP
+                        """,
+                        (key, model, prompt_version, Jsonb(result.model_dump()))
+                    )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Analyse-Cache: Speichern fehlgeschlagen: {e}")
+            return
+
+        self._stores_since_prune += 1
+        if self._stores_since_prune >= PRUNE_EVERY:
+            self._stores_since_prune = 0
+            await self.prune()
+
+    async def prune(self) -> int:
+        """
+        Entfernt abgelaufene Zeilen und stutzt die Tabelle auf ``max_rows``.
+
+        Returns:
+            Anzahl gelöschter Zeilen
+        """
+        deleted = 0
+        try:
+            async with database.connection() as conn:
+                async with conn.cursor() as cur:
+                    if self.ttl:
+                        await cur.execute(
+                            "DELETE FROM analysis_cache WHERE created_at < NOW() - make_interval(secs => %s)",
+                            (self.ttl,)
+                        )
+                        deleted += cur.rowcount
+                    if self.max_rows:
+                        await cur.execute(
+                            """
+                            DELETE FROM analysis_cache WHERE cache_key IN (
+                                SELECT cache_key FROM analysis_cache
+                                ORDER BY last_hit_at DESC OFFSET %s
+                            )
+                            """,
+                            (self.max_rows,)
+                        )
+                        deleted += cur.rowcount
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Analyse-Cache: Aufräumen fehlgeschlagen: {e}")
+            return 0
+        self.evictions += deleted
+        if deleted:
+            logger.info(f"Analyse-Cache: {deleted} Zeilen entfernt")
+        return deleted
+
+    def clear(self):
+        """Leert die Speicher-Stufe (die Tabelle bleibt)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für Health/Monitoring."""
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "memory_size": self.memory_size,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+    def _memory_get(self, key: str) -> Optional[AnalysisResult]:
+        if not self.memory_size:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            result, stored = entry
+            if self.ttl and time.monotonic() - stored > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return result.model_copy()
+
+    def _memory_put(self, key: str, result: AnalysisResult, stored: float):
+        if not self.memory_size:
+            return
+        with self._lock:
+            self._entries[key] = (result.model_copy(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.memory_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def _db_get(self, key: str) -> Optional[Tuple[AnalysisResult, float]]:
+        """Returns (result, Alter in Sekunden) oder None."""
+        try:
+            async with database.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        """
+                        UPDATE analysis_cache
+                        SET hits = hits + 1, last_hit_at = CURRENT_TIMESTAMP
+                        WHERE cache_key = %s
+                        AND (%s = 0 OR created_at >= NOW() - make_interval(secs => %s))
+                        RETURNING result, EXTRACT(EPOCH FROM (NOW() - created_at)) AS age
+                        """,
+                        (key, self.ttl, self.ttl)
+                    )
+                    row = await cur.fetchone()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Analyse-Cache: Lookup fehlgeschlagen: {e}")
+            return None
+        if row is None:
+            return None
+        return AnalysisResult(**row["result"]), float(row["age"])
+
+
+analysis_cache = AnalysisCache(
+    settings.analysis_cache_memory_size,
+    settings.analysis_cache_ttl,
+    settings.analysis_cache_max_rows,
+)
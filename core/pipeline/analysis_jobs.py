@@ -0,0 +1,225 @@
+"""Dauerhafte Job-Queue (Postgres) für die LLM-Analyse asynchron eingelieferter Signale."""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import database
+from config import settings
+from pipeline.analyzer import analyze_content
+from pipeline.audit_logger import write_audit_event
+
+logger = logging.getLogger(__name__)
+
+# analysis_status eines Signals, bis der Job fertig ist (Analysefelder bleiben NULL)
+PENDING = "pending"
+
+_workers: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+
+
+async def enqueue_analysis(cur, tenant_id: str, signal_id: str):
+    """
+    Reiht die Analyse eines Signals ein – in der Transaktion des Aufrufers.
+
+    Args:
+        cur: Cursor der laufenden Ingest-Transaktion
+        tenant_id: Tenant identifier
+        signal_id: Signal, dessen Analysefelder der Job füllt
+    """
+    await cur.execute(
+        "INSERT INTO analysis_jobs (signal_id, tenant_id) VALUES (%s, %s)",
+        (signal_id, tenant_id)
+    )
+
+
+def notify():
+    """Weckt einen wartenden Worker (nach dem Commit eines neuen Jobs)."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def claim_jobs(limit: int = 1) -> List[Dict[str, Any]]:
+    """
+    Übernimmt bis zu ``limit`` fällige Jobs samt Inhalt des Signals.
+
+    ``FOR UPDATE SKIP LOCKED`` lässt parallele Worker (auch in anderen
+    Prozessen) an verschiedenen Jobs arbeiten, ohne aufeinander zu warten.
+    Die Übernahme ist eine eigene, kurze Transaktion: während der Analyse
+    hält der Worker keine Verbindung. Stirbt er, läuft ``locked_until`` ab
+    und ein anderer Worker übernimmt den Job erneut.
+
+    Returns:
+        Jobs mit id, signal_id, tenant_id, attempts, anonymized_content
+    """
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                UPDATE analysis_jobs j
+                SET status = 'running', attempts = j.attempts + 1,
+                    locked_until = NOW() + make_interval(secs => %s), updated_at = NOW()
+                FROM signals s
+                WHERE s.signal_id = j.signal_id
+                AND j.id IN (
+                    SELECT id FROM analysis_jobs
+                    WHERE (status = 'queued' AND run_after <= NOW())
+                    OR (status = 'running' AND locked_until < NOW())
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING j.id, j.signal_id, j.tenant_id, j.attempts, s.anonymized_content
+                """,
+                (settings.analysis_job_lease, limit)
+            )
+            return await cur.fetchall()
+
+
+async def process_job(job: Dict[str, Any]) -> bool:
+    """
+    Analysiert ein übernommenes Signal und schreibt das Ergebnis.
+
+    Liefert das LLM kein Ergebnis (Breaker offen, überlastet, Fehler), geht
+    der Job über ``fail_job`` mit Backoff zurück in die Queue; erst beim
+    letzten Versuch wird das Keyword-Fallback-Ergebnis geschrieben.
+    Signal-Update, Löschen des Jobs und ``ANALYSIS``-Audit-Eintrag laufen in
+    einer Transaktion. Hat ein anderer Worker den Job nach abgelaufener
+    Lease bereits neu übernommen, wird das Ergebnis verworfen.
+
+    Args:
+        job: Zeile aus ``claim_jobs``
+
+    Returns:
+        True wenn das Ergebnis geschrieben wurde
+    """
+    final = job["attempts"] >= settings.analysis_job_max_attempts
+    analysis = await analyze_content(job["anonymized_content"], job["tenant_id"], allow_fallback=final)
+    if analysis is None:
+        await fail_job(job, RuntimeError("kein LLM-Ergebnis"))
+        return False
+
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "DELETE FROM analysis_jobs WHERE id = %s AND status = 'running' AND attempts = %s",
+                (job["id"], job["attempts"])
+            )
+            if cur.rowcount == 0:
+                logger.warning(f"Analyse-Job {job['id']} inzwischen neu vergeben – Ergebnis verworfen")
+                return False
+
+            await cur.execute(
+                """
+                UPDATE signals
+                SET category = %s, urgency = %s, sentiment = %s,
+                    metadata = COALESCE(metadata, '{}'::jsonb) || jsonb_build_object('summary', %s::text),
+                    analysis_status = 'done', updated_at = NOW()
+                WHERE signal_id = %s
+                """,
+                (analysis.category, analysis.urgency, analysis.sentiment, analysis.summary, job["signal_id"])
+            )
+            await write_audit_event(
+                cur,
+                tenant_id=job["tenant_id"],
+                signal_id=job["signal_id"],
+                action="ANALYSIS",
+                actor="system",
+                details={
+                    "category": analysis.category,
+                    "urgency": analysis.urgency,
+                    "attempts": job["attempts"]
+                }
+            )
+
+    logger.info(f"Signal {job['signal_id']} analysiert (Versuch {job['attempts']})")
+    return True
+
+
+async def fail_job(job: Dict[str, Any], error: Exception):
+    """
+    Gibt einen fehlgeschlagenen Job mit exponentiellem Backoff zurück in die
+    Queue bzw. markiert ihn nach ``analysis_job_max_attempts`` als ``failed``.
+    """
+    final = job["attempts"] >= settings.analysis_job_max_attempts
+    backoff = settings.analysis_job_retry_backoff * 2 ** (job["attempts"] - 1)
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                UPDATE analysis_jobs
+                SET status = %s, last_error = %s, locked_until = NULL,
+                    run_after = NOW() + make_interval(secs => %s), updated_at = NOW()
+                WHERE id = %s AND attempts = %s
+                """,
+                ("failed" if final else "queued", str(error)[:1000], backoff, job["id"], job["attempts"])
+            )
+            if final:
+                await cur.execute(
+                    "UPDATE signals SET analysis_status = 'failed', updated_at = NOW() WHERE signal_id = %s",
+                    (job["signal_id"],)
+                )
+    if final:
+        logger.error(f"Analyse-Job {job['id']} endgültig fehlgeschlagen: {error}")
+    else:
+        logger.warning(f"Analyse-Job {job['id']} fehlgeschlagen, neuer Versuch in {backoff:.0f} s: {error}")
+
+
+async def _worker(number: int):
+    """Holt Jobs, bis der Task abgebrochen wird; wartet bei leerer Queue."""
+    logger.info(f"Analyse-Worker {number} gestartet")
+    while True:
+        try:
+            jobs = await claim_jobs()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Analyse-Worker {number}: Jobs holen fehlgeschlagen: {e}")
+            jobs = []
+
+        if not jobs:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.analysis_job_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        for job in jobs:
+            try:
+                await process_job(job)
+            except asyncio.CancelledError:
+                # Job bleibt 'running' und wird nach Ablauf der Lease neu vergeben
+                raise
+            except Exception as e:
+                try:
+                    await fail_job(job, e)
+                except Exception as e2:
+                    logger.error(f"Analyse-Job {job['id']}: Fehlerstatus nicht gespeichert: {e2}")
+
+
+def start_workers(count: int):
+    """Startet ``count`` Worker-Tasks im laufenden Event-Loop (0 = keine)."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    for number in range(count):
+        _workers.append(asyncio.create_task(_worker(number), name=f"analysis-worker-{number}"))
+
+
+async def stop_workers():
+    """Bricht alle Worker ab und wartet auf ihr Ende."""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def queue_stats() -> Dict[str, int]:
+    """Anzahl Jobs je Status für Health/Monitoring."""
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT status, COUNT(*) AS count FROM analysis_jobs GROUP BY status")
+            counts = {row["status"]: row["count"] for row in await cur.fetchall()}
+    return {
+        "workers": len(_workers),
+        **{status: counts.get(status, 0) for status in ("queued", "running", "failed")}
+    }
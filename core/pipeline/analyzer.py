@@ -1,10 +1,18 @@
 """Content analysis module using Ollama LLM – liefert numerisches Sentiment."""
+import asyncio
 import logging
 import json
+from typing import Any, Dict, Optional, Tuple
+
 import httpx
 
 from config import settings
+from llm_client import get_client
 from models.schemas import AnalysisResult
+from pipeline.analysis_cache import analysis_cache, cache_key
+from pipeline.circuit_breaker import HALF_OPEN, ollama_breaker
+from pipeline.keyword_rules import matcher_for_tenant
+from pipeline.llm_dispatcher import Overloaded, llm_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +28,64 @@ SENTIMENT_MAP = {
 # Urgency-Mapping: Wort → Wert (für Normalisierung)
 URGENCY_MAP = {"low": 1, "medium": 2, "high": 3, "critical": 4}
 
+# Teil des Analyse-Cache-Schlüssels: bei jeder Änderung am Prompt erhöhen,
+# sonst liefert der Cache Ergebnisse des alten Prompts
+PROMPT_VERSION = "1"
+
+# Höchste Confidence eines Keyword-Ergebnisses, dessen "critical" nur an
+# Urgency-Keywords hängt (liegt unter jeder sinnvollen Schwelle)
+URGENCY_ONLY_CONFIDENCE = 0.5
+
+# Welche Stufe hat wie oft entschieden (Health/Monitoring)
+_tiers = {"keyword": 0, "cache": 0, "llm": 0, "fallback": 0}
+
+
+class _JsonObjectScanner:
+    """
+    Findet inkrementell das erste vollständige JSON-Objekt in einem Token-Strom.
+
+    Verfolgt die Klammertiefe und ignoriert dabei Klammern in Strings
+    (inkl. Escapes), damit ``"summary": "… {x} …"`` nicht vorzeitig schließt.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Hängt ``chunk`` an; liefert das Objekt, sobald seine Klammer schließt."""
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._start < 0:
+                if ch == "{":
+                    self._start = i
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    return text[self._start:i + 1]
+        self._pos = len(text)
+        return None
+
 
 def _sentiment_to_float(value) -> float:
     """Konvertiert Sentiment-String oder Zahl zu Float -1.0..+1.0."""
@@ -35,19 +101,91 @@ def _sentiment_to_float(value) -> float:
         return 0.0
 
 
-async def analyze_content(anonymized_content: str) -> AnalysisResult:
+async def analyze_content(
+    anonymized_content: str,
+    tenant_id: Optional[str] = None,
+    allow_fallback: bool = True,
+) -> Optional[AnalysisResult]:
     """
     Analysiert anonymisierten Text via Ollama.
 
     Gibt Kategorie, Dringlichkeit und numerisches Sentiment (-1..+1) zurück.
     Kein PII verlässt das System – nur anonymisierter Text wird ans LLM gesendet.
+    Zuerst läuft der Keyword-Klassifikator; liegt seine Confidence bei
+    mindestens ``keyword_confidence_threshold``, wird das LLM übersprungen.
+    Identische Inhalte (nach Normalisierung) kommen aus dem Analyse-Cache;
+    Fallback-Ergebnisse werden nie gecacht. Generierungen laufen über den
+    LLM-Dispatcher; ist das Modell überlastet oder der Circuit Breaker
+    offen (Ollama fällt aus oder antwortet zu langsam), gibt es sofort den
+    Fallback statt eines Timeouts.
 
     Args:
         anonymized_content: Text mit ersetzten PII-Feldern
+        tenant_id: Tenant, dessen ``urgency_rules`` der Keyword-Klassifikator anwendet
+        allow_fallback: False = None statt Keyword-Fallback, wenn weder
+            Keyword-Klassifikator, Cache noch LLM ein Ergebnis liefern
+            (Analyse-Jobs versuchen es dann später erneut)
 
     Returns:
-        AnalysisResult mit category, urgency, sentiment (float), summary
+        AnalysisResult mit category, urgency, sentiment (float), summary;
+        None nur bei ``allow_fallback=False``
     """
+    keyword_result, confidence = _keyword_analysis(anonymized_content, tenant_id)
+    if confidence >= settings.keyword_confidence_threshold:
+        _tiers["keyword"] += 1
+        logger.debug(f"Keyword-Klassifikator sicher ({confidence}) – LLM übersprungen")
+        return keyword_result
+
+    key = cache_key(settings.ollama_model, PROMPT_VERSION, anonymized_content)
+    cached = await analysis_cache.get(key)
+    if cached is not None:
+        _tiers["cache"] += 1
+        return cached
+
+    trial = ollama_breaker.state == HALF_OPEN
+    if not ollama_breaker.allow():
+        return _fallback(keyword_result, allow_fallback)
+
+    try:
+        result = await llm_dispatcher.run(
+            lambda: _guarded_analysis(anonymized_content, trial), succeeded=lambda r: r is not None
+        )
+    except Overloaded as e:
+        logger.warning(f"LLM überlastet – Fallback: {e}")
+        result = None
+    if result is None:
+        return _fallback(keyword_result, allow_fallback)
+
+    _tiers["llm"] += 1
+    await analysis_cache.put(key, result, settings.ollama_model, PROMPT_VERSION)
+    return result
+
+
+def _fallback(keyword_result: AnalysisResult, allow_fallback: bool) -> Optional[AnalysisResult]:
+    if not allow_fallback:
+        return None
+    _tiers["fallback"] += 1
+    return keyword_result
+
+
+def tier_stats() -> Dict[str, Any]:
+    """Anteil der Analysen je Stufe (keyword, cache, llm, fallback)."""
+    total = sum(_tiers.values())
+    return {
+        **_tiers,
+        "llm_skip_rate": round((_tiers["keyword"] + _tiers["cache"]) / total, 4) if total else 0.0,
+    }
+
+
+async def _guarded_analysis(anonymized_content: str, trial: bool) -> Optional[AnalysisResult]:
+    """``_ollama_analysis`` hinter dem Circuit Breaker (Latenz ohne Wartezeit im Dispatcher)."""
+    if not ollama_breaker.still_allowed(trial):
+        return None
+    return await ollama_breaker.call(lambda: _ollama_analysis(anonymized_content), lambda r: r is not None)
+
+
+async def _ollama_analysis(anonymized_content: str) -> Optional[AnalysisResult]:
+    """Eine Generierung via Ollama; None bei Fehler/Timeout/fehlendem JSON."""
     prompt = f"""Analysiere dieses Kunden-Feedback auf Deutsch und antworte NUR mit validem JSON.
 
 Feedback:
@@ -70,85 +208,117 @@ Hinweise:
 - Sentiment: -1.0 = sehr wütend, 0.0 = neutral, +1.0 = sehr begeistert"""
 
     try:
-        async with httpx.AsyncClient(timeout=45.0) as client:
-            response = await client.post(
-                f"{settings.ollama_url}/api/generate",
-                json={
-                    "model": settings.ollama_model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {"temperature": 0.05, "top_p": 0.9},
-                }
-            )
-
-            if response.status_code != 200:
-                logger.error(f"Ollama Fehler: {response.status_code}")
-                return _fallback_analysis(anonymized_content)
-
-            raw = response.json().get("response", "")
-            logger.debug(f"LLM raw response: {raw[:200]}")
-
-            # JSON aus Antwort extrahieren
-            j_start = raw.find("{")
-            j_end = raw.rfind("}") + 1
-            if j_start >= 0 and j_end > j_start:
-                data = json.loads(raw[j_start:j_end])
-                return AnalysisResult(
-                    category=data.get("category", "unknown"),
-                    urgency=data.get("urgency", "medium"),
-                    sentiment=_sentiment_to_float(data.get("sentiment", 0)),
-                    summary=data.get("summary", ""),
-                )
-            else:
-                logger.warning("Kein JSON in LLM-Antwort – Fallback")
-                return _fallback_analysis(anonymized_content)
-
-    except httpx.TimeoutException:
+        # ollama_timeout begrenzt die ganze Generierung, nicht nur einen Chunk
+        async with asyncio.timeout(settings.ollama_timeout):
+            obj = await _stream_json_object(prompt)
+
+        if obj is None:
+            logger.warning("Kein JSON in LLM-Antwort – Fallback")
+            return None
+
+        data = json.loads(obj)
+        return AnalysisResult(
+            category=data.get("category", "unknown"),
+            urgency=data.get("urgency", "medium"),
+            sentiment=_sentiment_to_float(data.get("sentiment", 0)),
+            summary=data.get("summary", ""),
+        )
+
+    except (httpx.TimeoutException, TimeoutError):
         logger.error("Ollama Timeout")
-        return _fallback_analysis(anonymized_content)
+        return None
     except Exception as e:
         logger.error(f"LLM-Analyse fehlgeschlagen: {e}", exc_info=True)
-        return _fallback_analysis(anonymized_content)
+        return None
+
+
+async def _stream_json_object(prompt: str) -> Optional[str]:
+    """
+    Streamt die Generierung und bricht ab, sobald das erste JSON-Objekt schließt.
 
+    Ollama liefert NDJSON-Zeilen ``{"response": "<token>", "done": false}``.
+    Verlassen des ``stream``-Kontexts vor ``done`` schließt die Verbindung;
+    Ollama beendet die Generierung dann, statt weitere Tokens Prosa nach dem
+    JSON zu rechnen. ``num_predict`` begrenzt den Fall, dass nie eins schließt.
+
+    Returns:
+        JSON-Objekt als Text oder None (HTTP-Fehler, kein Objekt bis ``done``)
+    """
+    scanner = _JsonObjectScanner()
+    async with get_client().stream(
+        "POST",
+        "/api/generate",
+        json={
+            "model": settings.ollama_model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": 0.05,
+                "top_p": 0.9,
+                "num_predict": settings.ollama_num_predict,
+            },
+        }
+    ) as response:
+        if response.status_code != 200:
+            logger.error(f"Ollama Fehler: {response.status_code}")
+            return None
+
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            obj = scanner.feed(chunk.get("response", ""))
+            if obj is not None:
+                return obj
+            if chunk.get("done"):
+                break
+
+    logger.debug(f"LLM raw response: {scanner.text[:200]}")
+    return None
 
-def _fallback_analysis(content: str) -> AnalysisResult:
-    """Keyword-basierter Fallback wenn Ollama nicht erreichbar."""
-    c = content.lower()
 
-    # Sentiment
-    pos = sum(1 for w in ["super","toll","top","danke","freundlich","wunderbar","prima","perfekt","klasse"] if w in c)
-    neg = sum(1 for w in ["problem","beschwerde","schlecht","nicht","fehler","hygiene","skandal","sofort","gravierend","nie wieder"] if w in c)
+def _keyword_analysis(content: str, tenant_id: Optional[str] = None) -> Tuple[AnalysisResult, float]:
+    """
+    Keyword-Klassifikator (Stufe 1 und Fallback, wenn Ollama nicht liefert):
+    Ergebnis plus Confidence 0..1.
+
+    Alle Stimmen kommen aus einem Durchlauf des kompilierten Matchers des
+    Tenants (Basis-Vokabular plus ``urgency_rules`` seines Templates).
+
+    Confidence ist hoch, wenn genau eine Kategorie mehrere Treffer hat, und
+    sinkt bei Treffern mehrerer Kategorien oder widersprüchlichem Sentiment.
+    Eindeutige Sicherheitsfälle (``SAFETY_KEYWORDS``) mit Beschwerde als
+    einziger Kategorie gelten immer als sicher – die sollen nicht auf das
+    LLM warten. Eine Dringlichkeit ``critical`` ohne diesen Beleg (nur
+    "sofort", "lebensmittel" oder eine Template-Regel) hält die Confidence
+    unter der Schwelle: über Dringlichkeit entscheidet dann das LLM.
+    """
+    votes = matcher_for_tenant(tenant_id).votes(content)
+    pos, neg = votes.positive, votes.negative
     sentiment = round(min(1.0, pos * 0.3) - min(1.0, neg * 0.3), 2)
 
-    # Kategorie
-    if any(w in c for w in ["beschwerde","problem","nicht geliefert","zu viel verrechnet","hygiene","fehler"]):
-        category = "complaint"
-    elif any(w in c for w in ["führt ihr","gibt es","wo finde","online bestell","wann"]):
-        category = "question"
-    elif any(w in c for w in ["bitte liefern","würde gern","wünsche"]):
-        category = "request"
-    elif any(w in c for w in ["super","toll","danke","freundlich","top","prima"]):
-        category = "praise"
+    # Kategorie: erste Kategorie (in Prioritätsreihenfolge) mit Treffern
+    matched = votes.matched_categories
+    if matched:
+        category = matched[0]
+        confidence = min(0.95, 0.6 + 0.15 * (votes.categories[category] - 1)) - 0.25 * (len(matched) - 1)
+        if (category == "praise" and neg > pos) or (category == "complaint" and pos > neg):
+            confidence -= 0.2
     else:
         category = "suggestion"
+        confidence = 0.3
 
-    # Urgency – Issue #2: extended critical keyword list for safety/hygiene
-    if any(w in c for w in [
-        "hygiene","gesundheit","lebensmittel","vergiftung","verletzung","unfall",
-        "gefährlich","sofortiger","dringend","notfall","rohes fleisch","handschuhe",
-        "sofort","kritisch","skandal",
-    ]):
-        urgency = "critical"
-    elif any(w in c for w in ["schnell","bald","wichtig","unverzüglich"]):
-        urgency = "high"
-    elif any(w in c for w in ["wenn möglich","gelegentlich"]):
-        urgency = "low"
-    else:
-        urgency = "medium"
+    urgency = votes.urgency_level
+    if urgency == "critical":
+        if votes.safety and matched == ["complaint"]:
+            confidence = max(confidence, 0.9)
+        else:
+            confidence = min(confidence, URGENCY_ONLY_CONFIDENCE)
 
-    return AnalysisResult(
+    result = AnalysisResult(
         category=category,
         urgency=urgency,
         sentiment=sentiment,
         summary=content[:120] + "…" if len(content) > 120 else content,
     )
+    return result, round(max(0.0, confidence), 2)
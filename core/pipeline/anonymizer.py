@@ -1,12 +1,14 @@
 """Anonymization module with pseudonymization and encryption."""
+import asyncio
 import hashlib
 import logging
-from typing import List, Dict, Any, Tuple
-from cryptography.fernet import Fernet
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from config import settings
+import database
+from pipeline.detections import Detections
+from pipeline.keys import keyring
+from pipeline.pseudonym_cache import pseudonym_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,21 +27,6 @@ ANIMALS = [
 ]
 
 
-def get_db_connection():
-    """Create a database connection."""
-    return psycopg2.connect(
-        settings.database_url,
-        cursor_factory=RealDictCursor
-    )
-
-
-def get_cipher():
-    """Get Fernet cipher for encryption."""
-    # Ensure key is properly formatted for Fernet
-    key = settings.encryption_key.encode() if isinstance(settings.encryption_key, str) else settings.encryption_key
-    return Fernet(key)
-
-
 def generate_pseudonym(original_value: str, pii_type: str) -> str:
     """
     Generate a fun, deterministic pseudonym from the original value.
@@ -72,7 +59,237 @@ def generate_pseudonym(original_value: str, pii_type: str) -> str:
     return f"{adjective}-{animal}{suffix}"
 
 
-def get_or_create_pseudonym(
+# Zeilen pro Multi-Row-INSERT (ein Statement für typische Nachrichten)
+INSERT_BATCH_SIZE = 500
+
+
+def pseudonym_values(pii_detections: Detections) -> Iterator[Tuple[str, str]]:
+    """
+    (original_value, pii_type) der Treffer, die ein Pseudonym-Mapping bekommen.
+
+    Kandidaten mit falscher Prüfsumme (``pii_checksum_mode="downweight"``)
+    werden von ``apply_pseudonyms`` nur maskiert – kein Mapping, keine
+    Verschlüsselung, kein DB-Schreibzugriff.
+    """
+    return ((d.value, d.type) for d in pii_detections if d.mapped)
+
+
+def _original_hash(tenant_id: str, original_value: str) -> str:
+    return hashlib.sha256(f"{tenant_id}:{original_value}".encode()).hexdigest()
+
+
+def _new_mapping_rows(
+    tenant_id: str,
+    missing: List[str],
+    pending: Dict[str, str],
+    types: Dict[str, str],
+    key_version: int,
+    cipher
+) -> List[tuple]:
+    """Baut die INSERT-Zeilen für neue Mappings (läuft per ``to_thread``, Verschlüsselung ist CPU-Arbeit)."""
+    rows = []
+    for original_hash in missing:
+        value = pending[original_hash]
+        rows.append((
+            tenant_id,
+            original_hash,
+            generate_pseudonym(value, types[value]),
+            types[value],
+            cipher.encrypt(value.encode()).decode(),
+            key_version,
+        ))
+    return rows
+
+
+@dataclass
+class PseudonymPlan:
+    """
+    Pseudonyme einer Nachricht, bevor die neuen Mappings geschrieben sind.
+
+    ``pseudonyms`` ist vollständig (bestehende + vorgeschlagene neue), die
+    neuen Zeilen landen erst mit ``write_pseudonyms`` in der Transaktion des
+    Aufrufers – zusammen mit allem anderen, was dort geschrieben wird.
+    """
+    tenant_id: str
+    pseudonyms: Dict[str, str]                                # original_value → pseudonym
+    hashes: Dict[str, str]                                    # original_hash → original_value
+    new_rows: List[tuple] = field(default_factory=list)       # INSERT-Zeilen, nach Hash sortiert
+    stored: Dict[str, str] = field(default_factory=dict)      # original_hash → pseudonym (in der DB)
+
+    def cache(self):
+        """Übernimmt die gespeicherten Mappings in den Cache – erst nach dem Commit aufrufen."""
+        pseudonym_cache.put_many(self.tenant_id, self.stored)
+
+
+async def plan_pseudonyms(
+    values: Iterable[Tuple[str, str]],
+    tenant_id: str
+) -> PseudonymPlan:
+    """
+    Ermittelt die Pseudonyme aller PII-Werte einer Nachricht, ohne zu schreiben.
+
+    Werte im Pseudonym-Cache kommen ohne DB-Zugriff zurück, die übrigen aus
+    einem ``= ANY(...)``-Lookup. Für fehlende Werte werden Pseudonym und
+    verschlüsselter Originalwert vorbereitet.
+
+    Args:
+        values: (original_value, pii_type)-Paare; Duplikate sind erlaubt,
+            bei mehreren Typen pro Wert zählt der erste
+        tenant_id: Tenant identifier
+
+    Returns:
+        PseudonymPlan
+    """
+    types: Dict[str, str] = {}
+    for original_value, pii_type in values:
+        types.setdefault(original_value, pii_type)
+
+    hashes = {_original_hash(tenant_id, value): value for value in types}
+    plan = PseudonymPlan(tenant_id, {}, hashes)
+    if not hashes:
+        return plan
+
+    # Wiederkehrende Absender: ganz ohne DB-Zugriff aus dem Cache
+    cached = pseudonym_cache.get_many(tenant_id, hashes)
+    plan.pseudonyms.update((hashes[h], pseudonym) for h, pseudonym in cached.items())
+    pending = {h: value for h, value in hashes.items() if h not in cached}
+    if not pending:
+        return plan
+
+    # Datenschlüssel des Tenants (Envelope-Verschlüsselung, gecacht) – vor der
+    # Pool-Ausleihe, ein Nachladen braucht selbst eine Verbindung
+    key_version, cipher = await keyring.data_key(tenant_id)
+
+    existing: Dict[str, str] = {}
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT original_hash, pseudonym FROM pseudonym_mapping "
+                "WHERE tenant_id = %s AND original_hash = ANY(%s)",
+                (tenant_id, list(pending))
+            )
+            for row in await cur.fetchall():
+                existing[row["original_hash"]] = row["pseudonym"]
+
+    # Bestehende Mappings sind bereits committet und dürfen sofort in den Cache
+    pseudonym_cache.put_many(tenant_id, existing)
+    plan.pseudonyms.update((pending[h], pseudonym) for h, pseudonym in existing.items())
+
+    # Nach Hash sortiert: parallele Inserts sperren die Zeilen in
+    # derselben Reihenfolge und können sich nicht gegenseitig blockieren
+    missing = sorted(h for h in pending if h not in existing)
+    if missing:
+        plan.new_rows = await asyncio.to_thread(
+            _new_mapping_rows, tenant_id, missing, pending, types, key_version, cipher
+        )
+        plan.pseudonyms.update((pending[row[1]], row[2]) for row in plan.new_rows)
+
+    logger.info(
+        f"Pseudonyme ermittelt: {len(types)} Werte, {len(cached)} aus Cache, {len(missing)} neu"
+    )
+    return plan
+
+
+async def write_pseudonyms(cur, plan: PseudonymPlan) -> bool:
+    """
+    Schreibt die neuen Mappings eines Plans mit dem Cursor des Aufrufers.
+
+    Multi-Row-INSERT; ``ON CONFLICT ... DO UPDATE`` (No-op) + ``RETURNING``
+    liefert auch Zeilen, die ein paralleler Request inzwischen angelegt hat –
+    beide Requests sehen so dasselbe gespeicherte Pseudonym. Committet wird
+    vom Aufrufer; danach ``plan.cache()``.
+
+    Args:
+        cur: Async-Cursor einer offenen Transaktion
+        plan: Ergebnis von ``plan_pseudonyms``
+
+    Returns:
+        True, wenn ein gespeichertes Pseudonym vom vorgeschlagenen abweicht
+        (der Inhalt muss dann neu pseudonymisiert werden)
+    """
+    changed = False
+    for i in range(0, len(plan.new_rows), INSERT_BATCH_SIZE):
+        batch = plan.new_rows[i:i + INSERT_BATCH_SIZE]
+        await cur.execute(
+            f"""
+            INSERT INTO pseudonym_mapping
+            (tenant_id, original_hash, pseudonym, pii_type, encrypted_original, key_version)
+            VALUES {", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(batch))}
+            ON CONFLICT (tenant_id, original_hash)
+            DO UPDATE SET pseudonym = pseudonym_mapping.pseudonym
+            RETURNING original_hash, pseudonym
+            """,
+            [param for row in batch for param in row]
+        )
+        for row in await cur.fetchall():
+            original_hash, pseudonym = row["original_hash"], row["pseudonym"]
+            plan.stored[original_hash] = pseudonym
+            value = plan.hashes[original_hash]
+            if plan.pseudonyms[value] != pseudonym:
+                plan.pseudonyms[value] = pseudonym
+                changed = True
+    return changed
+
+
+async def resolve_pseudonyms(
+    values: Iterable[Tuple[str, str]],
+    tenant_id: str
+) -> Dict[str, str]:
+    """
+    Resolve pseudonyms for all PII values of a message in one round trip.
+
+    ``plan_pseudonyms`` + ``write_pseudonyms`` in einer eigenen Transaktion.
+
+    Args:
+        values: (original_value, pii_type)-Paare
+        tenant_id: Tenant identifier
+
+    Returns:
+        original_value → pseudonym
+    """
+    plan = await plan_pseudonyms(values, tenant_id)
+    if plan.new_rows:
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await write_pseudonyms(cur, plan)
+        # Erst nach dem Commit cachen – nie ein Mapping, das es in der DB nicht gibt
+        plan.cache()
+    return plan.pseudonyms
+
+
+async def forget_pseudonyms(tenant_id: str, original_values: Optional[Iterable[str]] = None) -> int:
+    """
+    Löscht Pseudonym-Mappings (Art. 17 DSGVO) und invalidiert den Cache.
+
+    Args:
+        tenant_id: Tenant identifier
+        original_values: Klartext-Werte der betroffenen Person; None = alle
+            Mappings des Tenants
+
+    Returns:
+        Anzahl gelöschter Zeilen
+    """
+    hashes = None
+    if original_values is not None:
+        hashes = [_original_hash(tenant_id, value) for value in original_values]
+
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            if hashes is None:
+                await cur.execute("DELETE FROM pseudonym_mapping WHERE tenant_id = %s", (tenant_id,))
+            else:
+                await cur.execute(
+                    "DELETE FROM pseudonym_mapping WHERE tenant_id = %s AND original_hash = ANY(%s)",
+                    (tenant_id, hashes)
+                )
+            deleted = cur.rowcount
+
+    pseudonym_cache.invalidate(tenant_id, hashes)
+    logger.info(f"Pseudonym-Mappings gelöscht: {deleted} für Tenant {tenant_id}")
+    return deleted
+
+
+async def get_or_create_pseudonym(
     original_value: str,
     pii_type: str,
     tenant_id: str
@@ -82,6 +299,7 @@ def get_or_create_pseudonym(
 
     This ensures consistency: the same PII value always maps to the same pseudonym
     within a tenant, supporting data linkage while maintaining privacy.
+    Für mehrere Werte ``resolve_pseudonyms`` verwenden (ein Roundtrip).
 
     Args:
         original_value: The original PII value
@@ -91,89 +309,76 @@ def get_or_create_pseudonym(
     Returns:
         Pseudonym for the PII value
     """
-    # Create hash of original value for lookup
-    original_hash = hashlib.sha256(f"{tenant_id}:{original_value}".encode()).hexdigest()
-
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            # Check if pseudonym exists
-            cur.execute(
-                "SELECT pseudonym FROM pseudonym_mapping WHERE tenant_id = %s AND original_hash = %s",
-                (tenant_id, original_hash)
-            )
-            result = cur.fetchone()
-
-            if result:
-                return result["pseudonym"]
-
-            # Create new pseudonym
-            pseudonym = generate_pseudonym(original_value, pii_type)
-
-            # Encrypt original value
-            cipher = get_cipher()
-            encrypted_original = cipher.encrypt(original_value.encode()).decode()
-
-            # Store mapping
-            cur.execute(
-                """
-                INSERT INTO pseudonym_mapping
-                (tenant_id, original_hash, pseudonym, pii_type, encrypted_original)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (tenant_id, original_hash) DO NOTHING
-                """,
-                (tenant_id, original_hash, pseudonym, pii_type, encrypted_original)
-            )
-            conn.commit()
-
-            return pseudonym
-    finally:
-        conn.close()
+    return (await resolve_pseudonyms([(original_value, pii_type)], tenant_id))[original_value]
 
 
-def anonymize_content(
+def apply_pseudonyms(
     content: str,
-    pii_detections: List[Dict[str, Any]],
-    tenant_id: str
+    pii_detections: Detections,
+    pseudonyms: Dict[str, str]
 ) -> Tuple[str, List[Dict[str, str]]]:
     """
-    Anonymize content by replacing PII with pseudonyms.
+    Replace detected PII with already resolved pseudonyms.
 
     Args:
         content: Original content with PII
-        pii_detections: List of detected PII entities
-        tenant_id: Tenant identifier
+        pii_detections: Detections from ``detect_pii`` (sorted by position)
+        pseudonyms: original_value → pseudonym for every mapped detection
+            (``Detection.mapped``; die übrigen werden durch ``[TYP]`` ersetzt)
 
     Returns:
         Tuple of (anonymized_content, pseudonym_mappings)
     """
-    if not pii_detections:
-        return content, []
-
-    # Sort detections by position (reverse order to maintain positions during replacement)
-    sorted_detections = sorted(pii_detections, key=lambda x: x["start"], reverse=True)
-
-    anonymized = content
+    # Ein Durchlauf, ein join: die Abschnitte zwischen den Treffern werden
+    # gesammelt statt das Dokument pro Treffer neu zusammenzusetzen (O(n·k)).
+    # Rückwärts wie bisher, damit die Reihenfolge der Mappings gleich bleibt.
+    parts = []
     mappings = []
+    pos = len(content)
 
-    for detection in sorted_detections:
-        original_value = detection["value"]
-        pii_type = detection["type"]
-        start = detection["start"]
-        end = detection["end"]
-
-        # Get or create pseudonym
-        pseudonym = get_or_create_pseudonym(original_value, pii_type, tenant_id)
+    for detection in reversed(pii_detections):
+        start = detection.start
+        end = detection.end
+        pseudonym = pseudonyms[detection.value] if detection.mapped else detection.type.upper()
 
-        # Replace in content
-        anonymized = anonymized[:start] + f"[{pseudonym}]" + anonymized[end:]
+        parts.append(content[end:pos])
+        parts.append(f"[{pseudonym}]")
+        pos = start
 
         mappings.append({
-            "type": pii_type,
+            "type": detection.type,
             "pseudonym": pseudonym,
             "position": start
         })
 
+    parts.append(content[:pos])
+    parts.reverse()
+    return "".join(parts), mappings
+
+
+async def anonymize_content(
+    content: str,
+    pii_detections: Detections,
+    tenant_id: str
+) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Anonymize content by replacing PII with pseudonyms.
+
+    Args:
+        content: Original content with PII
+        pii_detections: Detections from ``detect_pii`` (sorted by position)
+        tenant_id: Tenant identifier
+
+    Returns:
+        Tuple of (anonymized_content, pseudonym_mappings)
+    """
+    if not pii_detections:
+        return content, []
+
+    # Alle Pseudonyme der Nachricht in einem DB-Roundtrip
+    pseudonyms = await resolve_pseudonyms(pseudonym_values(pii_detections), tenant_id)
+    anonymized, mappings = apply_pseudonyms(content, pii_detections, pseudonyms)
+
     logger.info(f"Anonymized content with {len(mappings)} replacements")
 
     return anonymized, mappings
@@ -2,19 +2,49 @@
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any
-import psycopg2
-from psycopg2.extras import RealDictCursor, Json
+from psycopg.types.json import Jsonb
 
-from config import settings
+import database
 
 logger = logging.getLogger(__name__)
 
 
-def get_db_connection():
-    """Create a database connection."""
-    return psycopg2.connect(
-        settings.database_url,
-        cursor_factory=RealDictCursor
+async def write_audit_event(
+    cur,
+    tenant_id: str,
+    action: str,
+    signal_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None
+):
+    """
+    Write an audit event with the caller's cursor (part of its transaction).
+
+    Anders als ``log_audit_event`` schlägt ein Fehler hier durch: der
+    Audit-Eintrag gehört dann zur selben Alles-oder-nichts-Transaktion.
+
+    Args:
+        cur: Async cursor of an open transaction
+        tenant_id: Tenant identifier
+        action: Action performed (INGEST, ACCESS, EXPORT, DELETE, etc.)
+        signal_id: Optional signal identifier
+        actor: Optional actor (user, system, etc.)
+        details: Optional additional details about the action
+    """
+    await cur.execute(
+        """
+        INSERT INTO audit_log
+        (tenant_id, signal_id, action, actor, details, timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """,
+        (
+            tenant_id,
+            signal_id,
+            action,
+            actor or "system",
+            Jsonb(details) if details else None,
+            datetime.utcnow()
+        )
     )
 
 
@@ -39,28 +69,10 @@ async def log_audit_event(
         details: Optional additional details about the action
     """
     try:
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO audit_log
-                    (tenant_id, signal_id, action, actor, details, timestamp)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        tenant_id,
-                        signal_id,
-                        action,
-                        actor or "system",
-                        Json(details) if details else None,
-                        datetime.utcnow()
-                    )
-                )
-                conn.commit()
-                logger.debug(f"Logged audit event: {action} for tenant {tenant_id}")
-        finally:
-            conn.close()
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await write_audit_event(cur, tenant_id, action, signal_id, actor, details)
+        logger.debug(f"Logged audit event: {action} for tenant {tenant_id}")
     except Exception as e:
         logger.error(f"Failed to log audit event: {e}", exc_info=True)
         # Don't raise - audit logging failure shouldn't break the main flow
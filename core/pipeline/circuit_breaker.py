@@ -0,0 +1,229 @@
+"""Circuit Breaker vor dem Ollama-Backend: bei Ausfall sofort Fallback statt Timeout."""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from config import settings
+from llm_client import get_client
+from pipeline.llm_dispatcher import llm_dispatcher
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed → Open → Half-Open um einen unzuverlässigen Backend-Aufruf.
+
+    Closed: alle Aufrufe laufen durch, die letzten ``window`` Ergebnisse
+    werden gezählt. Fehler und Aufrufe über ``slow_call`` Sekunden gelten als
+    schlecht; ab ``min_calls`` Ergebnissen und einer Quote ≥ ``error_rate``
+    öffnet der Breaker – ebenso nach ``min_calls`` schlechten Ergebnissen in
+    Folge, damit ein voll ausgefallenes Backend nicht erst gegen alte
+    Erfolge im Fenster „anarbeiten“ muss. Open: ``allow()`` ist False, Aufrufer nehmen sofort
+    den Fallback. Ein Hintergrund-Task prüft alle ``open_seconds`` mit
+    ``probe``, ob das Backend wieder antwortet, und schaltet dann auf
+    Half-Open. Half-Open: genau ein Probe-Aufruf mit echter Last; Erfolg
+    schließt den Breaker, Fehler öffnet ihn wieder. ``on_open`` läuft beim
+    Öffnen, z. B. um bereits Wartende sofort auf den Fallback zu schicken.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[bool]],
+        window: int = 20,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_call: float = 20.0,
+        open_seconds: float = 15.0,
+        trial_timeout: float = 60.0,
+        on_open: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Args:
+            probe: Leichter Erreichbarkeitstest für den Hintergrund-Task
+            window: Anzahl der letzten Ergebnisse, über die gezählt wird
+            min_calls: Mindestanzahl Ergebnisse, bevor der Breaker öffnen kann
+            error_rate: Quote schlechter Ergebnisse, ab der er öffnet
+            slow_call: Latenz in Sekunden, ab der ein Erfolg als schlecht zählt
+            open_seconds: Abstand der Probes im Zustand Open
+            trial_timeout: Nach so vielen Sekunden ohne Ergebnis gilt ein
+                Half-Open-Probeaufruf als verloren (z. B. abgebrochen)
+            on_open: Wird bei jedem Öffnen aufgerufen
+        """
+        self.probe = probe
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.trial_timeout = trial_timeout
+        self.on_open = on_open
+        self.state = CLOSED
+        self._results: Deque[bool] = deque(maxlen=window)
+        self._consecutive_bad = 0
+        self._changed_at = time.monotonic()
+        self._trial_started: Optional[float] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        self.trips = 0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        """
+        True wenn ein Aufruf ans Backend gehen darf; sonst direkt Fallback.
+
+        Im Zustand Half-Open ist der zugelassene Aufruf der Probeaufruf
+        (``trial`` – bis zu seinem ``record`` wird kein weiterer zugelassen).
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN:
+            now = time.monotonic()
+            if self._trial_started is None or now - self._trial_started > self.trial_timeout:
+                self._trial_started = now
+                return True
+        self.short_circuited += 1
+        return False
+
+    def still_allowed(self, trial: bool) -> bool:
+        """
+        Erneute Prüfung, wenn ein zugelassener Aufruf nach Wartezeit startet:
+        hat der Breaker inzwischen geöffnet, geht nur noch der Probeaufruf raus.
+        """
+        if self.state == CLOSED or (trial and self.state == HALF_OPEN):
+            return True
+        self.short_circuited += 1
+        return False
+
+    async def call(self, fn: Callable[[], Awaitable[T]], succeeded: Callable[[T], bool]) -> T:
+        """
+        Führt einen zugelassenen Aufruf aus und zeichnet Ergebnis und Latenz auf.
+
+        Läuft der Aufruf länger als ``slow_call``, zählt er sofort als schlecht –
+        bei einem hängenden Backend öffnet der Breaker so nach ``slow_call``
+        Sekunden statt erst nach dem vollen HTTP-Timeout.
+
+        Args:
+            fn: Coroutine-Factory für den Backend-Aufruf
+            succeeded: Bewertet das Ergebnis (False = Fehler)
+        """
+        start = time.monotonic()
+        overdue = False
+
+        def mark_overdue():
+            nonlocal overdue
+            overdue = True
+            self.record(False, time.monotonic() - start)
+
+        handle = asyncio.get_running_loop().call_later(self.slow_call, mark_overdue)
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if not overdue:
+                self.record(False, time.monotonic() - start)
+            raise
+        finally:
+            handle.cancel()
+        if not overdue:
+            self.record(succeeded(result), time.monotonic() - start)
+        return result
+
+    def record(self, success: bool, latency: float):
+        """
+        Ergebnis eines zugelassenen Aufrufs.
+
+        Args:
+            success: Backend hat eine verwertbare Antwort geliefert
+            latency: Dauer des Aufrufs in Sekunden (ohne Wartezeit davor)
+        """
+        good = success and latency <= self.slow_call
+        if self.state == HALF_OPEN:
+            self._trial_started = None
+            if good:
+                self._transition(CLOSED, f"Probeaufruf erfolgreich ({latency:.1f} s)")
+            else:
+                self._trip("Probeaufruf fehlgeschlagen" if not success else f"Probeaufruf zu langsam ({latency:.1f} s)")
+            return
+        if self.state == OPEN:
+            # Nachzügler aus der Zeit vor dem Öffnen
+            return
+
+        self._results.append(good)
+        self._consecutive_bad = 0 if good else self._consecutive_bad + 1
+        if self._consecutive_bad >= self.min_calls:
+            self._trip(f"{self._consecutive_bad} Aufrufe in Folge fehlerhaft oder langsam")
+        elif len(self._results) >= self.min_calls:
+            rate = self._results.count(False) / len(self._results)
+            if rate >= self.error_rate:
+                self._trip(f"{rate:.0%} der letzten {len(self._results)} Aufrufe fehlerhaft oder langsam")
+
+    def stats(self) -> Dict[str, Any]:
+        """Zustand und Kennzahlen für Health/Monitoring."""
+        calls = len(self._results)
+        return {
+            "state": self.state,
+            "since_seconds": round(time.monotonic() - self._changed_at, 1),
+            "window_calls": calls,
+            "window_error_rate": round(self._results.count(False) / calls, 4) if calls else 0.0,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+        }
+
+    async def stop(self):
+        """Beendet einen laufenden Probe-Task (Shutdown)."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+    def _trip(self, reason: str):
+        self.trips += 1
+        self._transition(OPEN, reason)
+        if self.on_open is not None:
+            self.on_open()
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    def _transition(self, state: str, reason: str):
+        logger.warning(f"Ollama-Breaker {self.state} → {state}: {reason}")
+        self.state = state
+        self._changed_at = time.monotonic()
+        self._results.clear()
+        self._consecutive_bad = 0
+        self._trial_started = None
+
+    async def _probe_loop(self):
+        while self.state == OPEN:
+            await asyncio.sleep(self.open_seconds)
+            try:
+                reachable = await self.probe()
+            except Exception as e:
+                logger.debug(f"Ollama-Probe fehlgeschlagen: {e}")
+                reachable = False
+            if reachable and self.state == OPEN:
+                self._transition(HALF_OPEN, "Probe erfolgreich")
+
+
+async def _ollama_reachable() -> bool:
+    response = await get_client().get("/api/tags", timeout=settings.ollama_health_timeout)
+    return response.status_code == 200
+
+
+ollama_breaker = CircuitBreaker(
+    _ollama_reachable,
+    settings.breaker_window,
+    settings.breaker_min_calls,
+    settings.breaker_error_rate,
+    settings.breaker_slow_call,
+    settings.breaker_open_seconds,
+    settings.ollama_timeout,
+    on_open=lambda: llm_dispatcher.shed("Ollama-Breaker offen"),
+)
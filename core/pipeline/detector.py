@@ -1,7 +1,21 @@
 """PII detection module using regex patterns for German/Austrian text."""
+import asyncio
+import multiprocessing
+import os
 import re
 import logging
-from typing import List, Dict, Any
+import threading
+from bisect import bisect_right
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Iterable, Iterator, Optional, Sequence, Union
+
+from config import settings
+from pipeline.detections import CHECKSUM_FAILED_CONFIDENCE, Detection, Detections
+from pipeline.gazetteer import DEFAULT_DIR, Gazetteer
+from pipeline.profiles import get_profile
+from pipeline.validators import iban_valid, luhn_valid, svnr_valid
 
 logger = logging.getLogger(__name__)
 
@@ -17,17 +31,9 @@ PATTERNS = {
     "austrian_ssn": r'\b\d{4}\s?\d{6}\b',
     "postal_code_at": r'\b[1-9]\d{3}\b(?=\s+[A-ZÄÖÜ][a-zäöüß])',  # AT PLZ vor Ortsname
     # Issue #6: Austrian/German address detection
-    "address":      r'\b[A-ZÄÖÜ][a-zäöüß]+(?:straße|gasse|platz|weg|allee|ring|promenade)\s+\d+(?:/\d+)?\b',
-}
-
-# Häufige österreichische/deutsche Vor- und Nachnamen (erweiterbar)
-FIRST_NAMES = {
-    "max","moritz","hans","peter","paul","franz","karl","thomas","michael","stefan",
-    "christian","markus","andreas","david","martin","florian","sebastian","alexander",
-    "lukas","simon","anna","maria","lisa","julia","sarah","laura","katharina","eva",
-    "sophie","lena","emma","hannah","nina","claudia","andrea","petra","monika","susanne",
-    "maria","marie","guntram","willi","günter","helmut","gerhard","walter","werner",
-    "ewald","alfred","heinz","dieter","reinhard","jürgen","manfred","rainer",
+    # (?=…\s+\d) bricht bei Wörtern ohne folgende Hausnummer sofort ab, statt
+    # jede Endung an jeder Backtracking-Position zu probieren – gleiche Treffer
+    "address":      r'\b[A-ZÄÖÜ](?=[a-zäöüß]++\s+\d)[a-zäöüß]+(?:straße|gasse|platz|weg|allee|ring|promenade)\s+\d+(?:/\d+)?\b',
 }
 
 # Issue #1: Full-name context patterns – detect BEFORE individual first-name scan
@@ -43,62 +49,421 @@ LAST_NAME_INDICATORS = [
 ]
 
 
-def detect_pii(content: str) -> List[Dict[str, Any]]:
+# Wortlisten in Prioritätsreihenfolge: Label → Datei in settings.gazetteer_dir
+GAZETTEER_FILES = {
+    "first_name": "first_names.txt",
+    "last_name": "last_names.txt",
+    "place": "places.txt",
+}
+
+GAZETTEER_CONFIDENCE = {"first_name": 0.85, "last_name": 0.80, "place": 0.70}
+
+# Pre-Gates: Mindestanzahl Ziffern bzw. Pflichtzeichen, ohne die ein Pattern
+# nicht matchen kann (aus den Patterns abgeleitet – bei Änderungen anpassen!).
+# Ein typisches Lob ("Super Service, danke!") überspringt so alle Regex-Familien
+# außer den Namen.
+MIN_DIGITS = {
+    "phone_at": 8,        # 0 + 1 + 3 + 3
+    "phone_de": 10,       # 49 + 2 + 3 + 3
+    "iban": 15,           # 2 + 3×4 + 1
+    "ip_address": 4,
+    "credit_card": 16,
+    "austrian_ssn": 10,
+    "postal_code_at": 4,
+    "address": 1,
+}
+REQUIRED_CHARS = {
+    "email": "@.",
+    "ip_address": ".",
+}
+
+# Prüfziffern: Kandidaten mit falscher Prüfsumme sind meist Bestell-, Kunden-
+# oder Sendungsnummern – jeder Fehltreffer kostet sonst einen DB-Roundtrip,
+# eine Verschlüsselung und eine dauerhafte pseudonym_mapping-Zeile
+VALIDATORS = {
+    "iban": iban_valid,
+    "credit_card": luhn_valid,
+    "austrian_ssn": svnr_valid,
+}
+
+# \d matcht auch Nicht-ASCII-Ziffern (z. B. "١٢٣"); kommen solche vor, wird
+# nicht gegated, damit das Ergebnis identisch bleibt
+_NON_ASCII_DIGIT_RE = re.compile(r'[^\D0-9]')
+_NO_GATE = 1 << 30
+
+
+def _compile_rules() -> tuple:
+    """
+    Kompiliert alle Erkennungsregeln einmalig beim Import.
+
+    Reihenfolge = Priorität: bei Überlappung gewinnt die zuerst registrierte
+    Regel. Jede Regel ist ``(pii_type, regex, group, confidence, min_digits,
+    required_chars, validator)``; ``group`` ist die Capture-Gruppe mit dem
+    eigentlichen PII-Wert, ``min_digits``/``required_chars`` sind die
+    Pre-Gates, ``validator`` die optionale Prüfziffern-Funktion.
+    """
+    rules = []
+    # 1. Regex-Patterns (including address – Issue #6)
+    for pii_type, pattern in PATTERNS.items():
+        rules.append((
+            pii_type, re.compile(pattern, re.IGNORECASE), 0, 1.0,
+            MIN_DIGITS.get(pii_type, 0), REQUIRED_CHARS.get(pii_type, ""),
+            VALIDATORS.get(pii_type),
+        ))
+    # 2. Issue #1: Vollständige Namen via Kontext-Patterns vor dem Vornamen-Scan
+    for pattern in LAST_NAME_INDICATORS:
+        rules.append(("full_name", re.compile(pattern), 1, 0.90, 0, "", None))
+    return tuple(rules)
+
+
+_RULES = _compile_rules()
+
+# Namen laufen unabhängig vom Tenant-Profil: die Templates listen nur die
+# strukturierten Typen, ein Abschalten der Namenserkennung wäre ein DSGVO-Leck
+ALWAYS_ON = frozenset({"full_name"})
+
+
+@lru_cache(maxsize=64)
+def _rules_for(pii_types: frozenset) -> tuple:
+    """Teilmenge von ``_RULES`` für ein Profil (Regex-Objekte werden geteilt)."""
+    unknown = pii_types - PATTERNS.keys() - ALWAYS_ON - set(GAZETTEER_FILES)
+    if unknown:
+        logger.warning(f"Unbekannte pii_types im Template ignoriert: {sorted(unknown)}")
+    return tuple(rule for rule in _RULES if rule[0] in pii_types or rule[0] in ALWAYS_ON)
+
+
+def rules_for_tenant(tenant_id: Optional[str]) -> tuple:
+    """
+    Erkennungsregeln eines Tenants laut Template (``pii_types``).
+
+    Ohne zugeordnetes Template laufen alle Regeln. Das Profil wird bei
+    YAML-Änderungen neu geladen; die kompilierte Auswahl ist pro Typ-Menge gecacht.
+    """
+    profile = get_profile(tenant_id)
+    if profile is None:
+        return _RULES
+    return _rules_for(profile.pii_types)
+
+# Beim Import gebaut: Worker, die per fork() entstehen, teilen sich die Tabellen
+GAZETTEER = Gazetteer.from_dir(settings.gazetteer_dir or DEFAULT_DIR, GAZETTEER_FILES)
+_GAZETTEER_RANK = {label: rank for rank, label in enumerate(GAZETTEER.labels)}
+
+
+class _SpanIndex:
+    """
+    Sortierter Index der bereits registrierten, überlappungsfreien Spans.
+
+    Da sich registrierte Spans nie überlappen, sind Starts und Enden gleich
+    sortiert; ein Kandidat kann daher nur mit dem direkten Vorgänger oder
+    Nachfolger seiner Einfügeposition kollidieren – O(log n) statt O(n).
+    """
+
+    __slots__ = ("starts", "ends", "items")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.items: List[Detection] = []
+
+    def slot(self, start: int, end: int) -> int:
+        """Einfügeposition für den Span, oder -1 wenn er Bestehendes überlappt."""
+        starts, ends = self.starts, self.ends
+        i = bisect_right(starts, start)
+        if i and ends[i - 1] > start and starts[i - 1] < end:
+            return -1
+        if i < len(starts) and starts[i] < end and ends[i] > start:
+            return -1
+        return i
+
+    def insert(self, i: int, start: int, end: int, item: Optional[Detection]):
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.items.insert(i, item)
+
+
+def _digit_census(content: str) -> int:
+    """Anzahl Ziffern im Text (C-Schleifen statt Regex; ``_NO_GATE`` bei Nicht-ASCII-Ziffern)."""
+    if not content.isascii() and _NON_ASCII_DIGIT_RE.search(content):
+        return _NO_GATE
+    return sum(map(content.count, "0123456789"))
+
+
+def _scan(content: str, rules: tuple = _RULES) -> List[Detection]:
+    """Ein Erkennungsdurchlauf über ``content``, nach Position sortiert (ohne Logging)."""
+    index = _SpanIndex()  # Verhindert Doppel-Matches; zuerst registriert gewinnt
+
+    def add_detection(pii_type: str, value: str, start: int, end: int, confidence: float = 1.0):
+        i = index.slot(start, end)
+        if i < 0:
+            return
+        index.insert(i, start, end, Detection(pii_type, value, start, end, confidence))
+
+    # Spans mit falscher Prüfsumme: Teilstücke davon (z. B. die letzte
+    # Vierergruppe einer Bestellnummer) dürfen nicht als PLZ o. Ä. nachrutschen
+    rejected = _SpanIndex()
+
+    digits = _digit_census(content)
+    checksum_mode = settings.pii_checksum_mode
+    for pii_type, regex, group, confidence, min_digits, required_chars, validator in rules:
+        # Pre-Gate: ganze Regex-Familie überspringen, wenn die nötigen Zeichen fehlen
+        if min_digits > digits:
+            continue
+        if required_chars and not all(c in content for c in required_chars):
+            continue
+        if checksum_mode == "off":
+            validator = None
+        for match in regex.finditer(content):
+            if group:
+                # Kontext-Pattern: nur der Namensteil wird registriert
+                name = match.group(group)
+                start = content.find(name, match.start())
+                add_detection(pii_type, name, start, start + len(name), confidence)
+                continue
+            value = match.group(0)
+            if index.slot(match.start(), match.end()) < 0:
+                continue  # schon von einer früheren Regel belegt
+            if rejected.starts and rejected.slot(match.start(), match.end()) < 0:
+                continue
+            if validator is not None and not validator(value):
+                # Falsche Prüfsumme: verwerfen oder mit niedriger Confidence nur maskieren
+                if checksum_mode == "drop":
+                    i = rejected.slot(match.start(), match.end())
+                    if i >= 0:
+                        rejected.insert(i, match.start(), match.end(), None)
+                    continue
+                add_detection(pii_type, value, match.start(), match.end(), CHECKSUM_FAILED_CONFIDENCE)
+                continue
+            add_detection(pii_type, value, match.start(), match.end(), confidence)
+
+    # 3. Vornamen, Nachnamen, Orte – ein Automaten-Durchlauf, läuft nach dem
+    # Full-Name-Scan. Registriert wird nach Position, bei gleichem Start der
+    # längere Eintrag zuerst ("Maria Enzersdorf" vor "Maria"), bei gleichem
+    # Span nach Listen-Priorität.
+    hits = sorted(GAZETTEER.finditer(content), key=lambda h: (h[1], -h[2], _GAZETTEER_RANK[h[0]]))
+    for label, start, end in hits:
+        add_detection(label, content[start:end], start, end, GAZETTEER_CONFIDENCE[label])
+
+    # Der Index hält die Treffer bereits nach Position sortiert
+    return index.items
+
+
+def detect_pii(content: str, tenant_id: Optional[str] = None) -> Detections:
     """
     Detect PII entities in German/Austrian text using regex patterns.
 
-    Erkennt: E-Mails, Telefonnummern (AT/DE), IBAN, Namen, IPs, PLZ, Adressen.
+    Erkennt: E-Mails, Telefonnummern (AT/DE), IBAN, Namen, IPs, PLZ, Adressen, Orte.
+    Alle Patterns sind in ``_RULES`` vorkompiliert; pro Aufruf wird nur noch gescannt.
 
     Args:
         content: Text content to scan for PII
+        tenant_id: Optional – beschränkt die Patterns auf die ``pii_types``
+            aus dem Template des Tenants
 
     Returns:
-        List of detected PII entities with type, value, start, end, confidence
+        Detections (nach Position sortiert) mit type, value, start, end,
+        confidence je Treffer und ``counts`` pro Typ
     """
-    detections = []
-    found_spans: List[tuple] = []  # Verhindert Doppel-Matches
+    detections = Detections(_scan(content, rules_for_tenant(tenant_id)))
+    logger.info(f"PII erkannt: {len(detections)} Felder – {detections.counts}")
 
-    def add_detection(pii_type: str, value: str, start: int, end: int, confidence: float = 1.0):
-        # Überlappungen verhindern
-        for (s, e) in found_spans:
-            if not (end <= s or start >= e):
-                return
-        found_spans.append((start, end))
-        detections.append({
-            "type": pii_type,
-            "value": value,
-            "start": start,
-            "end": end,
-            "confidence": confidence,
-        })
+    return detections
 
-    # 1. Regex-Patterns (including address – Issue #6)
-    for pii_type, pattern in PATTERNS.items():
-        for match in re.finditer(pattern, content, re.IGNORECASE):
-            add_detection(pii_type, match.group(0), match.start(), match.end())
 
-    # 2. Issue #1 FIX: Vollständige Namen via Kontext-Patterns FIRST
-    # Run full-name patterns before individual first-name scan so the complete
-    # "Vorname Nachname" span is locked and prevents the last name leaking through.
-    for pattern in LAST_NAME_INDICATORS:
-        for match in re.finditer(pattern, content):
-            name = match.group(1)
-            start = content.find(name, match.start())
-            if start >= 0:
-                add_detection("full_name", name, start, start + len(name), 0.90)
-
-    # 3. Vorname-Erkennung (case-insensitive Wortliste) – runs AFTER full-name scan
-    words = re.finditer(r'\b([A-ZÄÖÜ][a-zäöüß]{2,})\b', content)
-    for match in words:
-        if match.group(1).lower() in FIRST_NAMES:
-            add_detection("first_name", match.group(1), match.start(), match.end(), 0.85)
-
-    # Sortieren nach Position
-    detections.sort(key=lambda x: x["start"])
-
-    type_counts = {}
-    for d in detections:
-        type_counts[d["type"]] = type_counts.get(d["type"], 0) + 1
-    logger.info(f"PII erkannt: {len(detections)} Felder – {type_counts}")
+def detect_pii_stream(
+    source: Union[str, Iterable[str]],
+    window_size: Optional[int] = None,
+    overlap: Optional[int] = None,
+    tenant_id: Optional[str] = None,
+) -> Iterator[Detection]:
+    """
+    Streaming-Erkennung für sehr große Inhalte (Mail-Exporte, Chat-Transkripte).
 
-    return detections
+    Der Text wird in überlappenden Fenstern gescannt, sodass der Speicherbedarf
+    nur von der Fenstergröße abhängt. Ein Treffer wird ausgegeben, sobald er
+    vor dem Überlappungsbereich beginnt; Treffer über eine Fenstergrenze
+    hinweg werden im nächsten Fenster vollständig gefunden, solange sie
+    kürzer als ``overlap`` sind. Der Überlappungsbereich dient im nächsten
+    Fenster außerdem als Kontext für ``\\b``, "Herr …" und Lookaheads.
+
+    Args:
+        source: Gesamter Text oder beliebige Text-Chunks (z. B. Datei-Zeilen)
+        window_size: Zeichen pro Fenster (Default: ``settings.detector_window_size``)
+        overlap: Überlappung in Zeichen (Default: ``settings.detector_window_overlap``)
+        tenant_id: Optional – Tenant-Profil wie bei ``detect_pii``
+
+    Yields:
+        Detections wie ``detect_pii``, Positionen relativ zum Gesamttext,
+        in aufsteigender Reihenfolge
+    """
+    window_size = window_size or settings.detector_window_size
+    overlap = settings.detector_window_overlap if overlap is None else overlap
+    if not 0 <= overlap < window_size:
+        raise ValueError(f"overlap ({overlap}) muss kleiner als window_size ({window_size}) sein")
+    if isinstance(source, str):
+        source = (source,)
+    rules = rules_for_tenant(tenant_id)
+
+    buf = ""      # Kontext vor ``floor`` + noch nicht entschiedener Text
+    base = 0      # Position von buf[0] im Gesamttext
+    floor = 0     # alles davor ist entschieden (ausgegeben oder verdrängt)
+    pending: List[str] = []
+    pending_len = 0
+    type_counts: Dict[str, int] = {}
+
+    def scan(final: bool) -> Iterator[Detection]:
+        nonlocal buf, base, floor
+        cut = len(buf) if final else len(buf) - overlap
+        last_end = floor
+        for d in _scan(buf, rules):
+            start = base + d.start
+            if start < floor:
+                continue  # Kontextbereich, schon im vorigen Fenster entschieden
+            if d.start >= cut:
+                break     # Überlappungsbereich – kommt im nächsten Fenster vollständig
+            d.start, d.end = start, base + d.end
+            last_end = d.end
+            type_counts[d.type] = type_counts.get(d.type, 0) + 1
+            yield d
+        floor = max(base + cut, last_end)
+        keep = max(0, floor - overlap - base)
+        buf = buf[keep:]
+        base += keep
+
+    for chunk in source:
+        for i in range(0, len(chunk), window_size):
+            piece = chunk[i:i + window_size]
+            pending.append(piece)
+            pending_len += len(piece)
+            if len(buf) - (floor - base) + pending_len >= window_size + overlap:
+                buf += "".join(pending)
+                pending.clear()
+                pending_len = 0
+                yield from scan(final=False)
+    buf += "".join(pending)
+    if len(buf) > floor - base:
+        yield from scan(final=True)
+
+    logger.info(f"PII erkannt (Stream, {base + len(buf)} Zeichen): {sum(type_counts.values())} Felder – {type_counts}")
+
+
+def _detect_bounded(content: str, tenant_id: Optional[str] = None) -> Detections:
+    """Pool-Einstieg: große Inhalte fensterweise scannen, damit der Worker-Speicher begrenzt bleibt."""
+    if len(content) > 2 * settings.detector_window_size:
+        return Detections(detect_pii_stream(content, tenant_id=tenant_id))
+    return detect_pii(content, tenant_id)
+
+
+# Issue: detect_pii ist reine CPU-Arbeit – im Event-Loop blockiert ein Scan alle
+# anderen Requests. Der Pool startet in ``main.lifespan`` (sonst beim ersten
+# Aufruf, z. B. in Skripten oder nach einem Worker-Absturz).
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _pool_size() -> int:
+    return settings.detector_workers or os.cpu_count() or 1
+
+
+def _mp_context():
+    """
+    forkserver statt fork: ein fork() aus dem laufenden Server (Event-Loop,
+    DB-Pool, Executor-Threads) erbt Locks, die gerade ein anderer Thread hält,
+    und der Worker hängt. Der Forkserver ist ein frisch gestarteter Prozess
+    ohne Threads; er lädt dieses Modul einmal vor, die Worker erben Regeln
+    und Gazetteer von ihm. Wo es keinen Forkserver gibt: spawn.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def get_detector_pool() -> ProcessPoolExecutor:
+    """Liefert den gemeinsamen Prozess-Pool für die PII-Erkennung (lazy)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_pool_size(), mp_context=_mp_context())
+            logger.info(f"PII-Detektor-Pool gestartet: {_pool_size()} Prozesse")
+        return _pool
+
+
+def start_detector_pool():
+    """Startet den Pool beim App-Start, bevor weitere Threads laufen (nur bei mehr als einem Worker)."""
+    if _pool_size() > 1:
+        get_detector_pool()
+
+
+def shutdown_detector_pool():
+    """Beendet den Prozess-Pool (App-Shutdown oder nach einem Worker-Absturz)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _chunk_size(n_docs: int) -> int:
+    # Genug Chunks pro Worker für Lastausgleich bei unterschiedlich langen
+    # Dokumenten, aber groß genug, dass Pickling/IPC nicht dominiert
+    if settings.detector_chunk_size > 0:
+        return settings.detector_chunk_size
+    return max(1, min(256, n_docs // (_pool_size() * 4)))
+
+
+def detect_pii_batch(contents: Sequence[str], tenant_id: Optional[str] = None) -> List[Detections]:
+    """
+    Detect PII in many documents in parallel using the process pool.
+
+    Die Dokumente werden in Chunks an die Worker verteilt; die Reihenfolge
+    der Ergebnisse entspricht der Eingabe. Bei einem Dokument oder
+    ``detector_workers=1`` wird direkt im aufrufenden Prozess gescannt.
+
+    Args:
+        contents: Texte, die gescannt werden sollen
+        tenant_id: Optional – Tenant-Profil wie bei ``detect_pii``
+
+    Returns:
+        Pro Dokument die Detections (wie ``detect_pii``)
+    """
+    if len(contents) <= 1 or _pool_size() == 1:
+        return [_detect_bounded(content, tenant_id) for content in contents]
+
+    # Nur die Tenant-ID geht an die Worker; jeder löst das Profil selbst auf
+    detect = partial(_detect_bounded, tenant_id=tenant_id)
+    try:
+        return list(get_detector_pool().map(detect, contents, chunksize=_chunk_size(len(contents))))
+    except BrokenProcessPool:
+        logger.error("PII-Detektor-Pool abgestürzt – wird beim nächsten Aufruf neu gestartet")
+        shutdown_detector_pool()
+        raise
+
+
+async def detect_pii_async(content: str, tenant_id: Optional[str] = None) -> Detections:
+    """
+    Awaitable ``detect_pii`` für den Request-Pfad: scannt in einem Pool-Prozess,
+    der Event-Loop bleibt frei.
+
+    Args:
+        content: Text content to scan for PII
+        tenant_id: Optional – Tenant-Profil wie bei ``detect_pii``
+
+    Returns:
+        Detections (wie ``detect_pii``)
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_detector_pool(), _detect_bounded, content, tenant_id)
+    except BrokenProcessPool:
+        logger.error("PII-Detektor-Pool abgestürzt – wird beim nächsten Aufruf neu gestartet")
+        shutdown_detector_pool()
+        raise
+
+
+async def detect_pii_batch_async(
+    contents: Sequence[str], tenant_id: Optional[str] = None
+) -> List[Detections]:
+    """Awaitable ``detect_pii_batch`` (z. B. für Backfills aus einem Endpoint)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, detect_pii_batch, contents, tenant_id)
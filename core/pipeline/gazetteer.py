@@ -0,0 +1,218 @@
+"""Gazetteer-Erkennung (Vornamen, Nachnamen, Orte) per Aho-Corasick über Wort-Tokens."""
+import logging
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import accumulate, compress
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gazetteers")
+
+_TOKEN_RE = re.compile(r'\w+')
+_SPLIT_RE = re.compile(r'(\w+)')
+
+# Erstes Token eines Treffers muss wie ein Eigenname aussehen ("Max", "St", "Bad")
+_NAME_TOKEN_RE = re.compile(r'[A-ZÄÖÜ][a-zäöüß]+')
+
+# Trennzeichen, die zwischen den Tokens eines mehrteiligen Eintrags stehen dürfen
+# ("Sankt Pölten", "St. Pölten", "Wals-Siezenheim")
+_JOINERS = " .-"
+
+
+def load_wordlist(path: str) -> List[str]:
+    """
+    Liest eine Wortliste: ein Eintrag pro Zeile, ``#`` leitet Kommentare ein.
+
+    Args:
+        path: Pfad zur UTF-8-Textdatei
+
+    Returns:
+        Liste der Einträge (unverändert, ohne Leerzeilen/Kommentare)
+    """
+    entries = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                entries.append(line)
+    return entries
+
+
+class Gazetteer:
+    """
+    Aho-Corasick-Automat über Wort-Tokens für große Namens- und Ortslisten.
+
+    Das Alphabet sind die kleingeschriebenen Tokens aller Einträge, nicht
+    einzelne Zeichen: die Tokenisierung läuft in C (``re``), Python macht pro
+    Wort genau einen Übergang. Mehrteilige Einträge ("Bad Ischl") werden im
+    selben Durchlauf gefunden.
+
+    Die Zustandstabellen liegen in flachen ``array``-Blöcken statt in einem
+    dict pro Knoten. Das hält den Speicher klein und – weil Arrays keine
+    Python-Objekte pro Element enthalten – bleiben die Seiten nach einem
+    ``fork()`` zwischen Worker-Prozessen geteilt (kein Refcount-Copy-on-Write).
+    """
+
+    def __init__(self, lists: Dict[str, Iterable[str]]):
+        """
+        Args:
+            lists: Label → Einträge, in Prioritätsreihenfolge. Steht ein Eintrag
+                in mehreren Listen, gewinnt das zuerst genannte Label.
+        """
+        started = time.perf_counter()
+        self.labels: Tuple[str, ...] = tuple(lists)
+        self.vocab: Dict[str, int] = {}
+
+        # Aufbau mit dicts, danach in Arrays umgepackt
+        children: List[Dict[int, int]] = [{}]
+        out = [-1]
+        depth = [0]
+        entries = 0
+        for label_idx, label in enumerate(self.labels):
+            for entry in lists[label]:
+                tokens = _TOKEN_RE.findall(entry.lower())
+                if not tokens:
+                    continue
+                state = 0
+                for token in tokens:
+                    tok = self.vocab.setdefault(token, len(self.vocab) + 1)
+                    nxt = children[state].get(tok)
+                    if nxt is None:
+                        nxt = len(children)
+                        children[state][tok] = nxt
+                        children.append({})
+                        out.append(-1)
+                        depth.append(depth[state] + 1)
+                    state = nxt
+                if out[state] < 0:
+                    out[state] = label_idx
+                    entries += 1
+
+        # Fehler- und Ausgabe-Links per Breitensuche
+        fail = [0] * len(children)
+        outlink = [0] * len(children)
+        queue = deque(children[0].values())
+        while queue:
+            state = queue.popleft()
+            for tok, nxt in children[state].items():
+                f = fail[state]
+                while f and tok not in children[f]:
+                    f = fail[f]
+                fail[nxt] = children[f].get(tok, 0) if state else 0
+                outlink[nxt] = fail[nxt] if out[fail[nxt]] >= 0 else outlink[fail[nxt]]
+                queue.append(nxt)
+
+        self._stride = len(self.vocab) + 1
+        transitions = sorted(
+            (state * self._stride + tok, nxt)
+            for state, edges in enumerate(children)
+            for tok, nxt in edges.items()
+        )
+        self._keys = array("q", (k for k, _ in transitions))
+        self._targets = array("l", (v for _, v in transitions))
+        self._fail = array("l", fail)
+        self._outlink = array("l", outlink)
+        self._out = array("b", out)
+        self._depth = array("H", depth)
+        self.entries = entries
+        self.build_seconds = time.perf_counter() - started
+
+    @classmethod
+    def from_dir(cls, directory: str, files: Dict[str, str]) -> "Gazetteer":
+        """
+        Lädt die Wortlisten eines Verzeichnisses.
+
+        Args:
+            directory: Verzeichnis mit den Listen
+            files: Label → Dateiname, in Prioritätsreihenfolge; fehlende Dateien
+                werden mit Warnung übersprungen
+
+        Returns:
+            Fertig gebauter Gazetteer
+        """
+        lists = {}
+        for label, filename in files.items():
+            path = os.path.join(directory, filename)
+            if not os.path.exists(path):
+                logger.warning(f"Gazetteer-Liste fehlt: {path}")
+                lists[label] = []
+                continue
+            lists[label] = load_wordlist(path)
+        gazetteer = cls(lists)
+        stats = gazetteer.stats()
+        logger.info(
+            f"Gazetteer geladen: {stats['entries']} Einträge, {stats['states']} Zustände, "
+            f"{stats['memory_bytes'] / 1024:.0f} KiB, {stats['build_seconds'] * 1000:.0f} ms"
+        )
+        return gazetteer
+
+    def _goto(self, state: int, tok: int) -> int:
+        key = state * self._stride + tok
+        keys = self._keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return self._targets[i]
+        return -1
+
+    def finditer(self, content: str) -> Iterator[Tuple[str, int, int]]:
+        """
+        Findet alle Einträge in einem Durchlauf über die Wort-Tokens.
+
+        Liefert auch überlappende Treffer (z. B. "Maria" und "Maria Enzersdorf");
+        die Auflösung übernimmt der Aufrufer.
+
+        Yields:
+            (label, start, end) – Zeichenpositionen in ``content``
+        """
+        # Tokenisierung, Kleinschreibung und Vokabular-Lookup laufen komplett
+        # in C (split/map/accumulate); Python iteriert nur über Tokens, die
+        # überhaupt im Vokabular stehen.
+        parts = _SPLIT_RE.split(content)        # [sep, token, sep, token, …, sep]
+        tokens = parts[1::2]
+        ids = list(map(self.vocab.get, map(str.lower, tokens)))
+        offsets = list(accumulate(map(len, parts)))
+        fail, out, outlink, depth = self._fail, self._out, self._outlink, self._depth
+        labels = self.labels
+
+        state = 0
+        prev = -2
+        for i in compress(range(len(ids)), ids):
+            # Ein Token außerhalb des Vokabulars oder ein anderes Trennzeichen
+            # als " ", "." oder "-" dazwischen beendet jede Mehrwort-Phrase
+            if state and (i != prev + 1 or len(parts[2 * i]) > 2 or parts[2 * i].strip(_JOINERS)):
+                state = 0
+            prev = i
+
+            tok = ids[i]
+            while True:
+                nxt = self._goto(state, tok)
+                if nxt >= 0 or not state:
+                    break
+                state = fail[state]
+            state = nxt if nxt > 0 else 0
+
+            hit = state if out[state] >= 0 else outlink[state]
+            while hit:
+                first = i - depth[hit] + 1
+                if _NAME_TOKEN_RE.fullmatch(tokens[first]):
+                    yield labels[out[hit]], offsets[2 * first], offsets[2 * i + 1]
+                hit = outlink[hit]
+
+    def stats(self) -> Dict[str, Any]:
+        """Größe und Ladezeit des Automaten (für Logs/Monitoring)."""
+        tables = (self._keys, self._targets, self._fail, self._outlink, self._out, self._depth)
+        memory = sum(sys.getsizeof(t) for t in tables)
+        memory += sys.getsizeof(self.vocab) + sum(sys.getsizeof(t) for t in self.vocab)
+        return {
+            "entries": self.entries,
+            "states": len(self._fail),
+            "vocabulary": len(self.vocab),
+            "memory_bytes": memory,
+            "build_seconds": round(self.build_seconds, 4),
+        }
@@ -0,0 +1,190 @@
+"""Envelope-Verschlüsselung: Datenschlüssel pro Tenant, verpackt mit dem Master-Key."""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from cryptography.fernet import Fernet, MultiFernet
+
+import database
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# key_version 0 = Altbestand, direkt mit dem Master-Key verschlüsselt
+LEGACY_VERSION = 0
+
+
+_master: Optional[MultiFernet] = None
+
+
+def master_cipher() -> MultiFernet:
+    """
+    Master-Key(s) aus ``ENCRYPTION_KEY``; mehrere Keys kommagetrennt, der erste
+    verschlüsselt. So lässt sich auch der Master-Key rotieren: neuen Key vorne
+    einfügen, ``rewrap_data_keys`` laufen lassen (nur die wenigen
+    Datenschlüssel, nicht die Mappings), dann den alten Key entfernen.
+    """
+    global _master
+    if _master is None:
+        keys = [k.strip() for k in settings.encryption_key.split(",") if k.strip()]
+        _master = MultiFernet([Fernet(k.encode()) for k in keys])
+    return _master
+
+
+class KeyRing:
+    """
+    Cache der entpackten Datenschlüssel (DEKs) pro Tenant und Version.
+
+    Ein DEK wird einmal aus ``tenant_keys`` gelesen und mit dem Master-Key
+    entpackt; danach liegen nur noch die ``Fernet``-Objekte im Speicher.
+    Welche Version aktuell ist, wird nach ``data_key_cache_ttl`` Sekunden neu
+    gelesen, damit Worker eine Rotation aus einem anderen Prozess übernehmen.
+    """
+
+    def __init__(self):
+        self._ciphers: Dict[Tuple[str, int], Fernet] = {}
+        self._current: Dict[str, Tuple[int, float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def data_key(self, tenant_id: str) -> Tuple[int, Fernet]:
+        """
+        Aktueller Datenschlüssel eines Tenants; legt beim ersten Aufruf einen an.
+
+        Returns:
+            (key_version, cipher)
+        """
+        current = self._current.get(tenant_id)
+        if current and time.monotonic() - current[1] < settings.data_key_cache_ttl:
+            return current[0], self._ciphers[(tenant_id, current[0])]
+
+        async with self._lock:
+            version = await self._load_current(tenant_id)
+            if version is None:
+                version = await self._create(tenant_id, 1)
+            self._current[tenant_id] = (version, time.monotonic())
+            return version, self._ciphers[(tenant_id, version)]
+
+    async def cipher(self, tenant_id: str, version: int):
+        """Cipher zum Entschlüsseln einer bestimmten Version (0 = Master-Key)."""
+        if version == LEGACY_VERSION:
+            return master_cipher()
+        cipher = self._ciphers.get((tenant_id, version))
+        if cipher is None:
+            async with self._lock:
+                await self._load_version(tenant_id, version)
+                cipher = self._ciphers[(tenant_id, version)]
+        return cipher
+
+    async def rotate(self, tenant_id: str) -> int:
+        """
+        Legt eine neue Schlüsselversion an; neue Mappings nutzen sie sofort.
+
+        Returns:
+            Neue key_version
+        """
+        async with self._lock:
+            current = await self._load_current(tenant_id) or LEGACY_VERSION
+            version = await self._create(tenant_id, current + 1)
+            self._current[tenant_id] = (version, time.monotonic())
+        logger.info(f"Datenschlüssel für Tenant {tenant_id} rotiert: Version {version}")
+        return version
+
+    def forget(self, tenant_id: Optional[str] = None):
+        """Entfernt entpackte Schlüssel aus dem Speicher (alle oder eines Tenants)."""
+        for key in [k for k in self._ciphers if tenant_id is None or k[0] == tenant_id]:
+            del self._ciphers[key]
+        for key in [k for k in self._current if tenant_id is None or k == tenant_id]:
+            del self._current[key]
+
+    def _unwrap(self, tenant_id: str, version: int, wrapped_key: str):
+        self._ciphers[(tenant_id, version)] = Fernet(master_cipher().decrypt(wrapped_key.encode()))
+
+    async def _load_current(self, tenant_id: str) -> Optional[int]:
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    SELECT key_version, wrapped_key FROM tenant_keys
+                    WHERE tenant_id = %s ORDER BY key_version DESC LIMIT 1
+                    """,
+                    (tenant_id,)
+                )
+                row = await cur.fetchone()
+        if not row:
+            return None
+        if (tenant_id, row["key_version"]) not in self._ciphers:
+            self._unwrap(tenant_id, row["key_version"], row["wrapped_key"])
+        return row["key_version"]
+
+    async def _load_version(self, tenant_id: str, version: int):
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT wrapped_key FROM tenant_keys WHERE tenant_id = %s AND key_version = %s",
+                    (tenant_id, version)
+                )
+                row = await cur.fetchone()
+        if not row:
+            raise KeyError(f"Kein Datenschlüssel für Tenant {tenant_id}, Version {version}")
+        self._unwrap(tenant_id, version, row["wrapped_key"])
+
+    async def _create(self, tenant_id: str, version: int) -> int:
+        """Erzeugt und speichert einen DEK; bei parallelem Anlegen gewinnt der gespeicherte."""
+        wrapped = master_cipher().encrypt(Fernet.generate_key()).decode()
+        async with database.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    INSERT INTO tenant_keys (tenant_id, key_version, wrapped_key)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (tenant_id, key_version)
+                    DO UPDATE SET wrapped_key = tenant_keys.wrapped_key
+                    RETURNING wrapped_key
+                    """,
+                    (tenant_id, version, wrapped)
+                )
+                row = await cur.fetchone()
+        self._unwrap(tenant_id, version, row["wrapped_key"])
+        return version
+
+
+async def rewrap_data_keys() -> Dict[str, int]:
+    """
+    Verpackt alle Datenschlüssel in ``tenant_keys`` mit dem ersten Master-Key neu.
+
+    ``MultiFernet.rotate`` entschlüsselt mit irgendeinem der konfigurierten
+    Keys und verschlüsselt mit dem ersten; die DEKs selbst bleiben gleich,
+    Mappings müssen nicht angefasst werden. Mappings mit ``key_version`` 0
+    sind direkt mit dem Master-Key verschlüsselt – solange es davon welche
+    gibt (``legacy_rows``), darf der alte Master-Key nicht entfernt werden;
+    ``reencrypt_tenant`` bringt sie auf einen Datenschlüssel.
+
+    Returns:
+        Statistik: rewrapped, legacy_rows
+    """
+    master = master_cipher()
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT tenant_id, key_version, wrapped_key FROM tenant_keys FOR UPDATE")
+            rows = await cur.fetchall()
+            for row in rows:
+                await cur.execute(
+                    "UPDATE tenant_keys SET wrapped_key = %s WHERE tenant_id = %s AND key_version = %s",
+                    (master.rotate(row["wrapped_key"].encode()).decode(), row["tenant_id"], row["key_version"])
+                )
+            await cur.execute(
+                "SELECT COUNT(*) AS count FROM pseudonym_mapping WHERE key_version = %s", (LEGACY_VERSION,)
+            )
+            legacy_rows = (await cur.fetchone())["count"]
+
+    logger.info(f"{len(rows)} Datenschlüssel mit dem aktuellen Master-Key neu verpackt")
+    if legacy_rows:
+        logger.warning(
+            f"{legacy_rows} Mappings noch direkt mit dem Master-Key verschlüsselt – "
+            f"alten Master-Key erst nach Re-Encryption der betroffenen Tenants entfernen"
+        )
+    return {"rewrapped": len(rows), "legacy_rows": legacy_rows}
+
+
+keyring = KeyRing()
@@ -0,0 +1,231 @@
+"""Keyword-Regeln (Fallback-Vokabular + urgency_rules der Templates) als ein kompilierter Matcher."""
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from pipeline.profiles import TenantProfile, get_profile
+
+logger = logging.getLogger(__name__)
+
+# Basis-Vokabular (Teilstring-Treffer im kleingeschriebenen Text)
+POSITIVE_KEYWORDS = ["super", "toll", "top", "danke", "freundlich", "wunderbar", "prima", "perfekt", "klasse"]
+NEGATIVE_KEYWORDS = [
+    "problem", "beschwerde", "schlecht", "nicht", "fehler", "hygiene", "skandal", "sofort", "gravierend", "nie wieder",
+]
+# Reihenfolge = Priorität bei mehreren Kategorien mit Treffern
+CATEGORY_KEYWORDS = {
+    "complaint": ["beschwerde", "problem", "nicht geliefert", "zu viel verrechnet", "hygiene", "fehler"],
+    "question": ["führt ihr", "gibt es", "wo finde", "online bestell", "wann"],
+    "request": ["bitte liefern", "würde gern", "wünsche"],
+    "praise": ["super", "toll", "danke", "freundlich", "top", "prima"],
+}
+# Issue #2: extended critical keyword list for safety/hygiene
+URGENCY_KEYWORDS = {
+    "critical": [
+        "hygiene", "gesundheit", "lebensmittel", "vergiftung", "verletzung", "unfall",
+        "gefährlich", "sofortiger", "dringend", "notfall", "rohes fleisch", "handschuhe",
+        "sofort", "kritisch", "skandal",
+    ],
+    "high": ["schnell", "bald", "wichtig", "unverzüglich"],
+    "low": ["wenn möglich", "gelegentlich"],
+}
+# Eindeutige Sicherheits-/Hygienefälle: nur diese (zusammen mit einer
+# Beschwerde) dürfen das LLM überspringen – "sofort", "lebensmittel" oder
+# "handschuhe" allein kommen auch in harmlosen Fragen vor
+SAFETY_KEYWORDS = ["hygiene", "vergiftung", "verletzung", "unfall", "rohes fleisch", "gefährlich", "notfall"]
+# Schwere-Reihenfolge: die schwerste Stufe mit Treffern gewinnt
+URGENCY_LEVELS = ("critical", "high", "medium", "low")
+
+# Eine Regel = (Art, Label); Art ist "sentiment", "category", "urgency" oder "safety"
+Rule = Tuple[str, str]
+
+
+@dataclass
+class KeywordVotes:
+    """Treffer eines Durchlaufs: Anzahl verschiedener Keywords je Regel."""
+    positive: int = 0
+    negative: int = 0
+    safety: int = 0
+    categories: Dict[str, int] = field(default_factory=dict)
+    urgency: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def matched_categories(self) -> List[str]:
+        """Kategorien mit Treffern, in Prioritätsreihenfolge."""
+        return [cat for cat in CATEGORY_KEYWORDS if self.categories.get(cat)]
+
+    @property
+    def urgency_level(self) -> str:
+        """Schwerste Stufe mit Treffern, sonst ``medium``."""
+        for level in URGENCY_LEVELS:
+            if self.urgency.get(level):
+                return level
+        return "medium"
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex aus einem Präfixbaum: ``sofort(?:iger)?`` statt ``sofortiger|sofort``.
+
+    Pro Zeichen gibt es höchstens einen passenden Zweig, die Engine probiert
+    also nicht jede Alternative einzeln; greedy Optionals liefern an jeder
+    Position das längste Keyword.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        end = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if end else body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Alle Keyword-Regeln eines Tenants in einer kompilierten Regex.
+
+    Das Muster ist ein Präfixbaum aller Keywords; die Suche läuft in C und
+    liefert an der ersten passenden Position das längste Keyword. Keywords,
+    die in einem Treffer enthalten sind (``sofort`` in ``sofortiger``,
+    ``nicht`` in ``nicht geliefert``), sind vorberechnet. Nach einem Treffer
+    geht die Suche ab der ersten Stelle weiter, an der ein anderes Keyword
+    beginnen und über das Trefferende hinausragen kann (``nicht`` → ``toll``
+    ab dem ``t``), sonst ab dem Trefferende. Damit gilt dieselbe
+    Teilstring-Semantik wie bei ``w in text``, aber mit einem Durchlauf
+    statt einer Suche pro Keyword.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[Rule, Iterable[str]]]):
+        """
+        Args:
+            rules: (Regel, Keywords)-Paare; ein Keyword darf in mehreren Regeln stehen
+        """
+        self._rules: Dict[str, List[Rule]] = {}
+        for rule, words in rules:
+            for word in words:
+                word = word.lower().strip()
+                if word:
+                    self._rules.setdefault(word, []).append(rule)
+
+        words = list(self._rules)
+        self._implied: Dict[str, FrozenSet[str]] = {
+            word: frozenset(w for w in words if w in word) for word in words
+        }
+        # Offset, ab dem nach einem Treffer weitergesucht wird: erste Stelle,
+        # an der ein Keyword beginnt, das über das Trefferende hinausragt
+        self._resume: Dict[str, int] = {
+            word: next(
+                (i for i in range(1, len(word))
+                 if any(other.startswith(word[i:]) and len(other) > len(word) - i for other in words)),
+                len(word)
+            )
+            for word in words
+        }
+        self._regex = re.compile(_trie_pattern(words)) if words else None
+
+    @property
+    def keywords(self) -> int:
+        return len(self._rules)
+
+    def votes(self, content: str) -> KeywordVotes:
+        """
+        Ein Durchlauf über ``content``; jedes Keyword zählt höchstens einmal.
+
+        Args:
+            content: Text (wird hier kleingeschrieben)
+
+        Returns:
+            KeywordVotes mit Sentiment-, Kategorie- und Urgency-Stimmen
+        """
+        votes = KeywordVotes()
+        if self._regex is None:
+            return votes
+        text = content.lower()
+        search = self._regex.search
+        implied, resume = self._implied, self._resume
+        found = set()
+        match = search(text)
+        while match:
+            hit = match.group()
+            found |= implied[hit]
+            match = search(text, match.start() + resume[hit])
+
+        for word in found:
+            for kind, label in self._rules[word]:
+                if kind == "sentiment":
+                    if label == "positive":
+                        votes.positive += 1
+                    else:
+                        votes.negative += 1
+                elif kind == "category":
+                    votes.categories[label] = votes.categories.get(label, 0) + 1
+                elif kind == "safety":
+                    votes.safety += 1
+                else:
+                    votes.urgency[label] = votes.urgency.get(label, 0) + 1
+        return votes
+
+
+def _base_rules() -> List[Tuple[Rule, List[str]]]:
+    rules: List[Tuple[Rule, List[str]]] = [
+        (("sentiment", "positive"), POSITIVE_KEYWORDS),
+        (("sentiment", "negative"), NEGATIVE_KEYWORDS),
+    ]
+    rules += [(("category", cat), words) for cat, words in CATEGORY_KEYWORDS.items()]
+    rules += [(("urgency", level), words) for level, words in URGENCY_KEYWORDS.items()]
+    rules.append((("safety", "safety"), SAFETY_KEYWORDS))
+    return rules
+
+
+def _profile_rules(profile: TenantProfile) -> List[Tuple[Rule, List[str]]]:
+    """``urgency_rules`` eines Templates; ungültige Einträge werden übersprungen."""
+    rules = []
+    for entry in profile.urgency_rules:
+        keyword = entry.get("keyword") if isinstance(entry, dict) else None
+        level = entry.get("urgency") if isinstance(entry, dict) else None
+        if not isinstance(keyword, str) or level not in URGENCY_LEVELS:
+            logger.warning(f"Template '{profile.name}': ungültige urgency_rule {entry!r} ignoriert")
+            continue
+        rules.append((("urgency", level), [keyword]))
+    return rules
+
+
+BASE_MATCHER = KeywordMatcher(_base_rules())
+
+# Template-Name → (Profil, Matcher); ein neu geladenes Profil (andere Instanz)
+# baut den Matcher neu
+_tenant_matchers: Dict[str, Tuple[TenantProfile, KeywordMatcher]] = {}
+_lock = threading.Lock()
+
+
+def matcher_for_tenant(tenant_id: Optional[str]) -> KeywordMatcher:
+    """
+    Kompilierter Matcher eines Tenants: Basis-Vokabular plus ``urgency_rules``
+    aus seinem Template. Ohne Template oder Regeln der Basis-Matcher.
+    """
+    profile = get_profile(tenant_id) if tenant_id else None
+    if profile is None or not profile.urgency_rules:
+        return BASE_MATCHER
+
+    cached = _tenant_matchers.get(profile.name)
+    if cached and cached[0] is profile:
+        return cached[1]
+    with _lock:
+        cached = _tenant_matchers.get(profile.name)
+        if cached and cached[0] is profile:
+            return cached[1]
+        matcher = KeywordMatcher(_base_rules() + _profile_rules(profile))
+        _tenant_matchers[profile.name] = (profile, matcher)
+        logger.info(f"Keyword-Matcher für Template '{profile.name}' gebaut: {matcher.keywords} Keywords")
+        return matcher
@@ -0,0 +1,223 @@
+"""Begrenzt und regelt gleichzeitige LLM-Generierungen (adaptive Concurrency)."""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Glättung der Latenz (EWMA) und Drift der Basislatenz nach oben, damit sie
+# einem langsameren Modell folgt statt auf einem alten Minimum zu kleben
+LATENCY_SMOOTHING = 0.2
+BASELINE_DRIFT = 0.001
+# Multiplikative Absenkung des Limits bei Überlast
+DECREASE_FACTOR = 0.8
+
+
+class Overloaded(Exception):
+    """Anfrage abgewiesen: Warteschlange voll oder Deadline nicht haltbar."""
+
+
+class LLMDispatcher:
+    """
+    Semaphore mit adaptivem Limit und Deadline-bewusster Warteschlange.
+
+    Ein CPU-Modellserver hat einen festen Durchsatz; mehr gleichzeitige
+    Generierungen machen jede einzelne nur langsamer. Das Limit wird daher
+    nach AIMD aus der beobachteten Latenz geregelt: liegt eine Messung über
+    ``tolerance`` × Basislatenz (schnellste beobachtete Generierung), sinkt
+    das Limit um 20 %, sonst steigt es um 1/limit, solange es ausgeschöpft
+    wird. Wartende werden in FIFO-Reihenfolge zugelassen. Wer seine Deadline
+    laut Schätzung (Warteschlange × Latenz / Limit) nicht mehr schaffen kann,
+    wird sofort mit ``Overloaded`` abgewiesen statt nutzlos zu warten.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        tolerance: float = 2.0,
+        max_queue: int = 100,
+    ):
+        """
+        Args:
+            initial_limit: Start-Limit gleichzeitiger Generierungen
+            min_limit: Untergrenze des Limits
+            max_limit: Obergrenze des Limits
+            tolerance: Latenz/Basislatenz, ab der Überlast angenommen wird
+            max_queue: Maximale Wartende (0 = unbegrenzt)
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.max_queue = max_queue
+        self._limit = float(max(min_limit, min(max_limit, initial_limit)))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        deadline: Optional[float] = None,
+        succeeded: Optional[Callable[[T], bool]] = None,
+    ) -> T:
+        """
+        Führt ``call`` aus, sobald ein Slot frei ist.
+
+        Nur erfolgreiche Generierungen gehen in Latenz, Basislatenz und
+        Limit ein – ein schnell scheiternder Aufruf (Verbindungsfehler,
+        Breaker offen) würde die Basislatenz sonst so weit senken, dass jede
+        echte Generierung als Überlast gilt.
+
+        Args:
+            call: Coroutine-Factory für die Generierung
+            deadline: Absoluter ``time.monotonic()``-Zeitpunkt, bis zu dem das
+                Ergebnis da sein muss (None = ``llm_queue_deadline`` ab jetzt)
+            succeeded: Bewertet das Ergebnis (None = jedes Ergebnis ohne
+                Exception ist ein Erfolg)
+
+        Raises:
+            Overloaded: Nicht zugelassen oder Deadline beim Warten abgelaufen
+        """
+        if deadline is None:
+            deadline = time.monotonic() + settings.llm_queue_deadline
+        await self._acquire(deadline)
+        start = time.monotonic()
+        success = False
+        try:
+            result = await call()
+            success = succeeded is None or succeeded(result)
+            return result
+        finally:
+            if success:
+                self._record(time.monotonic() - start)
+            else:
+                self.failed += 1
+            self._release()
+
+    def shed(self, reason: str) -> int:
+        """
+        Weist alle Wartenden sofort mit ``Overloaded`` ab (z. B. Backend ausgefallen).
+
+        Returns:
+            Anzahl abgewiesener Wartender
+        """
+        shed = 0
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(Overloaded(reason))
+                shed += 1
+        self.rejected += shed
+        return shed
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für Health/Monitoring."""
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "latency_ms": round(self._latency * 1000, 1) if self._latency is not None else None,
+            "baseline_ms": round(self._baseline * 1000, 1) if self._baseline is not None else None,
+        }
+
+    async def _acquire(self, deadline: float):
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        now = time.monotonic()
+        if self.max_queue and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded("LLM-Warteschlange voll")
+        if self._latency is not None:
+            # Wartezeit bis zum eigenen Slot plus eigene Generierung
+            expected = (len(self._waiters) + 1) / self.limit * self._latency + self._latency
+            if now + expected > deadline:
+                self.rejected += 1
+                raise Overloaded(f"Deadline nicht haltbar (erwartet {expected:.1f} s)")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=max(0.0, deadline - now))
+        except Overloaded:
+            raise
+        except asyncio.TimeoutError:
+            self.expired += 1
+            raise Overloaded("Deadline in der LLM-Warteschlange abgelaufen")
+        except asyncio.CancelledError:
+            # Slot schon übergeben, aber der Aufrufer ist weg: weiterreichen
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _record(self, latency: float):
+        self.completed += 1
+        self._latency = latency if self._latency is None else (
+            self._latency + LATENCY_SMOOTHING * (latency - self._latency)
+        )
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            self._baseline += BASELINE_DRIFT * (latency - self._baseline)
+
+        now = time.monotonic()
+        if latency > self.tolerance * self._baseline:
+            # Höchstens eine Absenkung pro Basislatenz: die gerade laufenden
+            # Anfragen messen noch die alte Überlast
+            if now - self._last_decrease > self._baseline:
+                self._limit = max(self.min_limit, self._limit * DECREASE_FACTOR)
+                self._last_decrease = now
+                logger.info(f"LLM-Concurrency gesenkt auf {self.limit} (Latenz {latency:.1f} s)")
+        elif self._in_flight >= self.limit:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        self._wake()
+
+
+llm_dispatcher = LLMDispatcher(
+    settings.llm_concurrency_initial,
+    settings.llm_concurrency_min,
+    settings.llm_concurrency_max,
+    settings.llm_latency_tolerance,
+    settings.llm_queue_max,
+)
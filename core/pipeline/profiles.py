@@ -0,0 +1,165 @@
+"""Tenant-Profile aus templates/*.yaml (PII-Typen, Kategorien, Urgency-Regeln)."""
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Docker mountet ./templates nach /app/templates (= core/templates), lokal liegt
+# das Verzeichnis neben core/
+DEFAULT_DIRS = (
+    os.path.join(_CORE_DIR, "templates"),
+    os.path.join(os.path.dirname(_CORE_DIR), "templates"),
+)
+
+# Wie scripts/create-tenant.sh – verhindert Pfade wie "../x" im Template-Lookup
+_NAME_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+
+@dataclass(frozen=True)
+class TenantProfile:
+    """Geladenes Template; ``pii_types`` steuert, welche Patterns laufen."""
+    name: str
+    pii_types: frozenset
+    categories: Tuple[str, ...] = ()
+    urgency_rules: Tuple[Dict[str, Any], ...] = ()
+    retention_days: Optional[int] = None
+    description: str = ""
+    path: str = field(default="", compare=False)
+
+
+def templates_dir() -> Optional[str]:
+    """Konfiguriertes oder erstes vorhandenes Standard-Verzeichnis."""
+    if settings.templates_dir:
+        return settings.templates_dir
+    for directory in DEFAULT_DIRS:
+        if os.path.isdir(directory):
+            return directory
+    return None
+
+
+def load_template(path: str) -> TenantProfile:
+    """
+    Liest ein Template-YAML.
+
+    Args:
+        path: Pfad zur YAML-Datei
+
+    Returns:
+        TenantProfile
+
+    Raises:
+        ValueError: wenn das YAML kein Mapping ist oder ``pii_types`` fehlt
+    """
+    with open(path, encoding="utf-8") as fh:
+        data = yaml.safe_load(fh)
+    if not isinstance(data, dict) or not isinstance(data.get("pii_types"), list):
+        raise ValueError(f"Template {path}: 'pii_types' (Liste) fehlt")
+    return TenantProfile(
+        name=data.get("name") or os.path.splitext(os.path.basename(path))[0],
+        pii_types=frozenset(data["pii_types"]),
+        categories=tuple(data.get("categories") or ()),
+        urgency_rules=tuple(data.get("urgency_rules") or ()),
+        retention_days=data.get("retention_days"),
+        description=data.get("description", ""),
+        path=path,
+    )
+
+
+class ProfileRegistry:
+    """
+    Cache der Templates pro Datei, neu geladen sobald sich die mtime ändert.
+
+    Ein ``os.stat`` pro Lookup ist billig genug für den Request-Pfad und
+    macht Änderungen am gemounteten Template-Verzeichnis ohne Neustart wirksam.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[float, Optional[TenantProfile]]] = {}
+        self._lock = threading.Lock()
+
+    def template_for(self, tenant_id: Optional[str]) -> Optional[str]:
+        """Template-Name eines Tenants: Mapping aus den Settings, sonst gleichnamiges Template."""
+        if tenant_id and tenant_id in settings.tenant_templates:
+            return settings.tenant_templates[tenant_id]
+        directory = templates_dir()
+        if tenant_id and directory and _NAME_RE.match(tenant_id) and os.path.exists(os.path.join(directory, f"{tenant_id}.yaml")):
+            return tenant_id
+        return settings.default_template
+
+    def get(self, tenant_id: Optional[str]) -> Optional[TenantProfile]:
+        """
+        Profil eines Tenants.
+
+        Args:
+            tenant_id: Tenant-ID (None = kein Profil)
+
+        Returns:
+            TenantProfile, oder None wenn kein Template zugeordnet ist bzw. es
+            nicht geladen werden kann (dann läuft der volle Detektor)
+        """
+        name = self.template_for(tenant_id)
+        return self.get_template(name) if name else None
+
+    def get_template(self, name: str) -> Optional[TenantProfile]:
+        """Profil über den Template-Namen (``retail`` → ``retail.yaml``)."""
+        directory = templates_dir()
+        if not directory or not _NAME_RE.match(name):
+            return None
+        path = os.path.join(directory, f"{name}.yaml")
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            logger.warning(f"Template '{name}' nicht gefunden: {path}")
+            return None
+
+        cached = self._cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            try:
+                profile = load_template(path)
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                # Kaputtes YAML beim Hot-Reload: letzte gültige Version behalten
+                # (und erst bei der nächsten Änderung erneut parsen)
+                logger.error(f"Template {path} konnte nicht geladen werden: {e}")
+                profile = cached[1] if cached else None
+                self._cache[path] = (mtime, profile)
+                return profile
+            self._cache[path] = (mtime, profile)
+            logger.info(f"Template '{profile.name}' geladen: pii_types={sorted(profile.pii_types)}")
+            return profile
+
+    def list_profiles(self) -> List[TenantProfile]:
+        """Alle Templates im Verzeichnis (z. B. für Admin-/Health-Ausgaben)."""
+        directory = templates_dir()
+        if not directory:
+            return []
+        profiles = []
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".yaml"):
+                profile = self.get_template(filename[:-len(".yaml")])
+                if profile:
+                    profiles.append(profile)
+        return profiles
+
+
+registry = ProfileRegistry()
+
+
+def get_profile(tenant_id: Optional[str]) -> Optional[TenantProfile]:
+    """Kurzform für ``registry.get``."""
+    return registry.get(tenant_id)
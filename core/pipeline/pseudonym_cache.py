@@ -0,0 +1,122 @@
+"""Prozesslokaler LRU/TTL-Cache für Pseudonyme, pro Tenant, ohne Klartext-Schlüssel."""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PseudonymCache:
+    """
+    Begrenzter Cache ``(tenant_id, original_hash) → pseudonym``.
+
+    Schlüssel ist der mit der Tenant-ID gesalzene SHA-256 aus dem Anonymizer,
+    nie der Klartext – im Speicher liegen keine PII. Einträge verfallen nach
+    ``ttl`` Sekunden; das begrenzt auch, wie lange ein anderer Worker-Prozess
+    nach einer Löschung noch ein altes Mapping sieht (``invalidate`` wirkt nur
+    im eigenen Prozess).
+    """
+
+    def __init__(self, max_size: int, ttl: float = 0.0):
+        """
+        Args:
+            max_size: Maximale Einträge über alle Tenants (0 = Cache aus)
+            ttl: Lebensdauer in Sekunden (0 = kein Ablauf)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_many(self, tenant_id: str, hashes: Iterable[str]) -> Dict[str, str]:
+        """
+        Schlägt mehrere Hashes nach.
+
+        Returns:
+            original_hash → pseudonym für alle Treffer
+        """
+        found = {}
+        if not self.max_size:
+            return found
+        now = time.monotonic()
+        with self._lock:
+            for original_hash in hashes:
+                key = (tenant_id, original_hash)
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    continue
+                pseudonym, stored = entry
+                if self.ttl and now - stored > self.ttl:
+                    del self._entries[key]
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[original_hash] = pseudonym
+                self.hits += 1
+        return found
+
+    def put_many(self, tenant_id: str, pseudonyms: Dict[str, str]):
+        """Speichert original_hash → pseudonym und verdrängt die ältesten Einträge."""
+        if not self.max_size:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for original_hash, pseudonym in pseudonyms.items():
+                key = (tenant_id, original_hash)
+                self._entries[key] = (pseudonym, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tenant_id: str, hashes: Optional[Iterable[str]] = None) -> int:
+        """
+        Invalidierungs-Hook für Lösch- und Auskunftsersuchen (Art. 17 DSGVO).
+
+        Args:
+            tenant_id: Tenant identifier
+            hashes: Zu entfernende original_hashes; None = alle Einträge des Tenants
+
+        Returns:
+            Anzahl entfernter Einträge
+        """
+        with self._lock:
+            if hashes is None:
+                keys = [key for key in self._entries if key[0] == tenant_id]
+            else:
+                keys = [(tenant_id, h) for h in hashes if (tenant_id, h) in self._entries]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        if keys:
+            logger.info(f"Pseudonym-Cache: {len(keys)} Einträge für Tenant {tenant_id} invalidiert")
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für Health/Monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+pseudonym_cache = PseudonymCache(settings.pseudonym_cache_size, settings.pseudonym_cache_ttl)
@@ -0,0 +1,169 @@
+"""Re-Encryption von ``pseudonym_mapping`` auf den aktuellen Datenschlüssel eines Tenants."""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import database
+from config import settings
+from pipeline.keys import keyring
+
+logger = logging.getLogger(__name__)
+
+
+def _reencrypt_rows(rows: List[dict], ciphers: Dict[int, object], target_version: int) -> List[object]:
+    """Entschlüsselt mit der alten und verschlüsselt mit der Zielversion (läuft per ``to_thread``)."""
+    target = ciphers[target_version]
+    params = []
+    for row in rows:
+        plaintext = ciphers[row["key_version"]].decrypt(row["encrypted_original"].encode())
+        params.extend((row["id"], target.encrypt(plaintext).decode()))
+    return params
+
+
+async def _reencrypt_batch(
+    tenant_id: str,
+    target_version: int,
+    batch_size: int,
+    ciphers: Dict[int, object]
+) -> int:
+    """
+    Verschlüsselt einen Batch alter Zeilen in einer eigenen, kurzen Transaktion neu.
+
+    ``FOR UPDATE SKIP LOCKED`` überspringt Zeilen, die gerade ein Ingest-Insert
+    (ON CONFLICT) oder ein zweiter Job hält – niemand wartet aufeinander.
+
+    Returns:
+        Anzahl neu verschlüsselter Zeilen (0 = nichts mehr greifbar)
+    """
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT id, key_version, encrypted_original FROM pseudonym_mapping
+                WHERE tenant_id = %s AND key_version < %s
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (tenant_id, target_version, batch_size)
+            )
+            rows = await cur.fetchall()
+            if not rows:
+                return 0
+
+            params = await asyncio.to_thread(_reencrypt_rows, rows, ciphers, target_version)
+            await cur.execute(
+                f"""
+                UPDATE pseudonym_mapping AS m
+                SET encrypted_original = v.encrypted_original, key_version = %s
+                FROM (VALUES {", ".join(["(%s, %s)"] * len(rows))}) AS v(id, encrypted_original)
+                WHERE m.id = v.id
+                """,
+                [target_version] + params
+            )
+            return len(rows)
+
+
+async def _pending(tenant_id: str, target_version: int) -> int:
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT COUNT(*) AS pending FROM pseudonym_mapping WHERE tenant_id = %s AND key_version < %s",
+                (tenant_id, target_version)
+            )
+            return (await cur.fetchone())["pending"]
+
+
+async def _retire_unused_keys(tenant_id: str, target_version: int) -> int:
+    """Markiert alte Schlüsselversionen ohne verbleibende Zeilen als ausgemustert."""
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                UPDATE tenant_keys SET retired_at = CURRENT_TIMESTAMP
+                WHERE tenant_id = %s AND key_version < %s AND retired_at IS NULL
+                AND NOT EXISTS (
+                    SELECT 1 FROM pseudonym_mapping m
+                    WHERE m.tenant_id = tenant_keys.tenant_id AND m.key_version = tenant_keys.key_version
+                )
+                """,
+                (tenant_id, target_version)
+            )
+            return cur.rowcount
+
+
+async def reencrypt_tenant(
+    tenant_id: str,
+    rotate: bool = True,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    Rotiert den Datenschlüssel eines Tenants und verschlüsselt alle Mappings neu.
+
+    Der Job ist fortsetzbar: der Fortschritt steht in ``key_version`` jeder
+    Zeile. Nach einem Abbruch mit ``rotate=False`` neu starten, dann wird nur
+    der Rest auf die aktuelle Version gebracht. Die DB-Last bleibt begrenzt
+    (``batch_size`` Zeilen pro Transaktion, ``pause`` Sekunden dazwischen).
+
+    Worker, die die Rotation noch nicht gesehen haben, schreiben bis zu
+    ``data_key_cache_ttl`` Sekunden lang mit der alten Version weiter; diese
+    Zeilen holt ein zweiter Durchlauf nach Ablauf der Frist.
+
+    Args:
+        tenant_id: Tenant identifier
+        rotate: Vorher eine neue Schlüsselversion anlegen
+        batch_size: Zeilen pro Transaktion (Default: ``reencrypt_batch_size``)
+        pause: Pause zwischen Batches in Sekunden (Default: ``reencrypt_pause``)
+
+    Returns:
+        Statistik: target_version, reencrypted, pending, retired
+    """
+    batch_size = batch_size or settings.reencrypt_batch_size
+    pause = settings.reencrypt_pause if pause is None else pause
+
+    if rotate:
+        target_version = await keyring.rotate(tenant_id)
+    else:
+        target_version = (await keyring.data_key(tenant_id))[0]
+    grace_until = time.monotonic() + settings.data_key_cache_ttl
+
+    # Alle Versionen vorab entpacken (Versionen sind lückenlos, Zeilen in
+    # tenant_keys werden nie gelöscht) – ohne zweite Pool-Ausleihe pro Batch
+    ciphers = {version: await keyring.cipher(tenant_id, version) for version in range(target_version + 1)}
+
+    reencrypted = 0
+    while True:
+        while True:
+            done = await _reencrypt_batch(tenant_id, target_version, batch_size, ciphers)
+            if not done:
+                break
+            reencrypted += done
+            logger.info(f"Re-Encryption {tenant_id}: {reencrypted} Zeilen auf Version {target_version}")
+            if pause:
+                await asyncio.sleep(pause)
+
+        # Nachzügler anderer Worker abwarten, dann ein letzter Durchlauf
+        remaining = grace_until - time.monotonic()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(remaining)
+        grace_until = 0.0
+
+    pending = await _pending(tenant_id, target_version)
+    retired = await _retire_unused_keys(tenant_id, target_version) if not pending else 0
+    if pending:
+        logger.warning(
+            f"Re-Encryption {tenant_id}: {pending} Zeilen noch gesperrt oder alt – Job erneut starten"
+        )
+    logger.info(
+        f"Re-Encryption {tenant_id} fertig: {reencrypted} Zeilen, Version {target_version}, "
+        f"{retired} Schlüssel ausgemustert"
+    )
+    return {
+        "target_version": target_version,
+        "reencrypted": reencrypted,
+        "pending": pending,
+        "retired": retired,
+    }
@@ -0,0 +1,95 @@
+"""Ingest unit of work: pseudonyms, signal, audit entry (and analysis job) in one transaction."""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from psycopg.types.json import Jsonb
+
+import database
+from models.schemas import AnalysisResult, IngestRequest
+from pipeline.analysis_jobs import PENDING, enqueue_analysis
+from pipeline.anonymizer import PseudonymPlan, apply_pseudonyms, write_pseudonyms
+from pipeline.audit_logger import write_audit_event
+from pipeline.detections import Detections
+
+logger = logging.getLogger(__name__)
+
+
+async def commit_ingest(
+    request: IngestRequest,
+    signal_id: str,
+    pii_detections: Detections,
+    plan: PseudonymPlan,
+    anonymized_content: str,
+    analysis: Optional[AnalysisResult],
+    audit_details: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Write everything an ingest produces on one pooled connection, one commit.
+
+    Neue Pseudonym-Mappings, die ``signals``-Zeile und der ``INGEST``-Eintrag
+    im Audit-Log werden gemeinsam committet oder gar nicht – ein Absturz
+    zwischen den Schritten hinterlässt keine halben Daten mehr.
+
+    Ohne ``analysis`` (asynchroner Ingest) wird das Signal mit Status
+    ``pending`` und leeren (NULL) Analysefeldern gespeichert und in derselben
+    Transaktion ein Analyse-Job eingereiht; die Analysefelder füllt später
+    ein Worker.
+
+    Args:
+        request: Original ingest request
+        signal_id: Generated signal ID
+        pii_detections: Detections of the request content
+        plan: Pseudonym plan from ``plan_pseudonyms``
+        anonymized_content: Content anonymized with ``plan.pseudonyms``
+        analysis: LLM analysis result, None = analyse later via job queue
+        audit_details: Details for the INGEST audit entry
+
+    Returns:
+        Stored anonymized content (re-rendered if a concurrent request stored
+        a different pseudonym for one of the values in the meantime)
+    """
+    async with database.connection() as conn:
+        async with conn.cursor() as cur:
+            if await write_pseudonyms(cur, plan):
+                anonymized_content, _ = apply_pseudonyms(request.content, pii_detections, plan.pseudonyms)
+
+            now = datetime.utcnow()
+            await cur.execute("""
+                INSERT INTO signals
+                (tenant_id, signal_id, category, urgency, sentiment, anonymized_content, metadata,
+                 analysis_status, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                request.tenant_id,
+                signal_id,
+                analysis.category if analysis else None,
+                analysis.urgency if analysis else None,
+                analysis.sentiment if analysis else None,
+                anonymized_content,
+                Jsonb({
+                    "source": request.source,
+                    "pii_count": len(pii_detections),
+                    "original_metadata": request.metadata,
+                    "summary": analysis.summary if analysis else None
+                }),
+                "done" if analysis else PENDING,
+                now,
+                now
+            ))
+            if analysis is None:
+                await enqueue_analysis(cur, request.tenant_id, signal_id)
+
+            await write_audit_event(
+                cur,
+                tenant_id=request.tenant_id,
+                signal_id=signal_id,
+                action="INGEST",
+                actor="system",
+                details=audit_details
+            )
+
+    # Erst nach dem Commit cachen – nie ein Mapping, das es in der DB nicht gibt
+    plan.cache()
+    logger.info(f"Signal {signal_id} stored with {len(plan.new_rows)} new pseudonyms in one transaction")
+    return anonymized_content
@@ -67,9 +67,9 @@ function renderSignals(data) {
                 <div class="signal-id">${signal.signal_id}</div>
             </div>
             <div class="signal-badges">
-                <span class="badge urgency-${signal.urgency}">${signal.urgency}</span>
-                <span class="badge sentiment-${signal.sentiment}">${signal.sentiment}</span>
-                <span class="badge category">${signal.category}</span>
+                <span class="badge urgency-${signal.urgency}">${signal.urgency ?? signal.analysis_status}</span>
+                <span class="badge sentiment-${signal.sentiment}">${signal.sentiment ?? signal.analysis_status}</span>
+                <span class="badge category">${signal.category ?? signal.analysis_status}</span>
             </div>
             <div class="signal-content">
                 ${signal.anonymized_content}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Misst den Durchsatz von detect_pii auf langen deutschen E-Mails, PII-dichten Listen und kurzem Lob."""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core"))
+
+from config import settings  # noqa: E402
+from pipeline.detector import detect_pii, detect_pii_batch, shutdown_detector_pool  # noqa: E402
+
+logging.disable(logging.INFO)
+
+GREETINGS = ["Sehr geehrte Damen und Herren,", "Grüß Gott,", "Hallo zusammen,", "Guten Tag,"]
+SENTENCES = [
+    "Meine Bestellung vom 14. Februar wurde leider nicht geliefert.",
+    "Die Bio-Äpfel aus Vorarlberg waren wirklich top, danke dafür.",
+    "Im Markt hat ein Mitarbeiter ohne Handschuhe rohes Fleisch angefasst.",
+    "Mir wurden 3,20€ zu viel verrechnet, bitte um Gutschrift.",
+    "Führt ihr Dinkelmehl Type 1050 auch online?",
+    "Ich warte seit drei Wochen auf eine Rückmeldung.",
+    "Das Personal an der Kassa war sehr freundlich.",
+]
+FIRST = ["Max", "Anna", "Maria", "Thomas", "Lisa", "Günter", "Jürgen", "Eva"]
+LAST = ["Mustermann", "Schneider", "Fink", "Huber", "Gruber", "Wagner", "Pichler"]
+CITIES = ["Dornbirn", "Bregenz", "Wien", "Graz", "Linz", "Salzburg"]
+PRAISE = [
+    "Super Service, danke!",
+    "Die Verkäuferin in der Filiale war sehr nett und hilfsbereit.",
+    "Tolle Auswahl an regionalen Produkten, weiter so!",
+    "Schnelle Lieferung und alles bestens verpackt.",
+    "Sehr zufrieden, gerne wieder.",
+]
+
+
+def signature(rng: random.Random) -> str:
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    return (
+        f"Mit freundlichen Grüßen\n{first} {last}\n"
+        f"Marktstraße {rng.randint(1, 99)}, {rng.randint(1000, 9999)} {rng.choice(CITIES)}\n"
+        f"Tel: 0664/{rng.randint(1000000, 9999999)}\n"
+        f"{first.lower()}.{last.lower()}@gmx.at\n"
+    )
+
+
+def long_email(rng: random.Random, replies: int = 12) -> str:
+    """Weitergeleiteter Mail-Thread mit Zitaten und Signaturen."""
+    parts = []
+    for _ in range(replies):
+        parts.append(rng.choice(GREETINGS))
+        parts.extend(rng.choice(SENTENCES) for _ in range(rng.randint(4, 12)))
+        parts.append(signature(rng))
+        parts.append(f"-----Ursprüngliche Nachricht-----\nVon: Herr {rng.choice(LAST)}")
+    return "\n".join(parts)
+
+
+def dense_list(rng: random.Random, rows: int = 1000) -> str:
+    """CSV-Export / Telefonliste mit mehreren PII-Treffern pro Zeile."""
+    lines = ["Name;E-Mail;Telefon;IBAN"]
+    for _ in range(rows):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        lines.append(
+            f"{first} {last};{first.lower()}.{last.lower()}{rng.randint(1, 999)}@gmx.at;"
+            f"+43 664 {rng.randint(1000, 9999)} {rng.randint(100, 999)};"
+            f"AT{rng.randint(10, 99)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)} "
+            f"{rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+        )
+    return "\n".join(lines)
+
+
+def short_praise(rng: random.Random) -> str:
+    """Typisches kurzes Lob ohne strukturierte PII."""
+    return " ".join(rng.sample(PRAISE, rng.randint(1, 3)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--kind", choices=["email", "dense", "praise"], default="email")
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=1000, help="Zeilen pro Liste (--kind dense)")
+    parser.add_argument("--replies", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="Bester von N Durchläufen")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="detect_pii_batch mit N Prozessen statt sequenziell (0 = CPU-Kerne)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.kind == "dense":
+        docs = [dense_list(rng, args.rows) for _ in range(args.docs)]
+    elif args.kind == "praise":
+        docs = [short_praise(rng) for _ in range(args.docs)]
+    else:
+        docs = [long_email(rng, args.replies) for _ in range(args.docs)]
+    total_bytes = sum(len(d.encode()) for d in docs)
+
+    if args.workers is not None:
+        settings.detector_workers = args.workers
+        detect_pii_batch(docs[:2])  # Pool-Start nicht mitmessen
+
+    elapsed = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        if args.workers is None:
+            hits = sum(len(detect_pii(d)) for d in docs)
+        else:
+            hits = sum(len(r) for r in detect_pii_batch(docs))
+        elapsed = min(elapsed, time.perf_counter() - start)
+    shutdown_detector_pool()
+
+    print(f"{len(docs)} Dokumente, Ø {total_bytes // len(docs)} Bytes, {hits} PII-Treffer")
+    print(f"{len(docs) / elapsed:.1f} docs/s  |  {total_bytes / elapsed / 1e6:.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Vergleicht den kompilierten Keyword-Matcher mit den früheren ``any(w in c …)``-Scans.
+
+Läuft auf dem synthetischen Korpus aus ``feedback_corpus.py`` und prüft
+vorher, dass beide Varianten ohne Tenant-Regeln dieselben Ergebnisse liefern
+und der Keyword-Klassifikator bei den Regressionsfällen unten das LLM nur
+überspringt, wo es soll (Exit-Code 1 sonst).
+
+    python scripts/bench-keywords.py --docs 2000
+    python scripts/bench-keywords.py --tenant energie     # mit urgency_rules
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import feedback_corpus  # noqa: E402
+from config import settings  # noqa: E402
+from pipeline.analyzer import _keyword_analysis  # noqa: E402
+from pipeline.keyword_rules import matcher_for_tenant  # noqa: E402
+
+logging.disable(logging.INFO)
+
+
+# (Tenant, Nachricht, LLM übersprungen?) – "critical" allein per Teilstring
+# ("lebensmittel", "sofort", "handschuhe", Template-Regel "tonight") darf das
+# LLM nicht überspringen, eine eindeutige Hygienebeschwerde schon
+CLASSIFIER_CASES = [
+    (None, "Gibt es bei euch glutenfreie Lebensmittel?", False),
+    (None, "Bitte ruft mich sofort zurück, ich will einen Tisch reservieren.", False),
+    (None, "Wo finde ich die Handschuhe im Sortiment?", False),
+    (None, "Ich habe rohes Fleisch im Burger gefunden, mir ist schlecht.", False),
+    ("tourismus", "We are arriving tonight, is late check-in possible?", False),
+    (None, "Ein Mitarbeiter hat ohne Handschuhe rohes Fleisch angefasst. Das ist ein gravierendes "
+           "Hygieneproblem, ich verlange eine Beschwerde-Bearbeitung!", True),
+    (None, "Super Service, danke! Die Verkäuferin war sehr freundlich, alles top.", True),
+]
+
+
+def check_classifier_cases() -> int:
+    """Prüft ``CLASSIFIER_CASES``; gibt die Anzahl der Fehlschläge zurück."""
+    failures = 0
+    for tenant, content, skips_llm in CLASSIFIER_CASES:
+        result, confidence = _keyword_analysis(content, tenant)
+        skipped = confidence >= settings.keyword_confidence_threshold
+        if skipped != skips_llm:
+            failures += 1
+            print(f"FEHLER: {content!r} → {result.category}/{result.urgency}, Confidence {confidence} "
+                  f"({'übersprungen' if skipped else 'LLM'}, erwartet {'übersprungen' if skips_llm else 'LLM'})")
+    print(f"{len(CLASSIFIER_CASES) - failures}/{len(CLASSIFIER_CASES)} Regressionsfälle Keyword-Klassifikator ok")
+    return failures
+
+
+def reference_votes(content: str):
+    """Bisherige Implementierung: eine Teilstring-Suche pro Keyword, Listen pro Aufruf neu."""
+    c = content.lower()
+    pos = sum(1 for w in ["super","toll","top","danke","freundlich","wunderbar","prima","perfekt","klasse"] if w in c)
+    neg = sum(1 for w in ["problem","beschwerde","schlecht","nicht","fehler","hygiene","skandal","sofort","gravierend","nie wieder"] if w in c)
+
+    if any(w in c for w in ["beschwerde","problem","nicht geliefert","zu viel verrechnet","hygiene","fehler"]):
+        category = "complaint"
+    elif any(w in c for w in ["führt ihr","gibt es","wo finde","online bestell","wann"]):
+        category = "question"
+    elif any(w in c for w in ["bitte liefern","würde gern","wünsche"]):
+        category = "request"
+    elif any(w in c for w in ["super","toll","danke","freundlich","top","prima"]):
+        category = "praise"
+    else:
+        category = "suggestion"
+
+    if any(w in c for w in [
+        "hygiene","gesundheit","lebensmittel","vergiftung","verletzung","unfall",
+        "gefährlich","sofortiger","dringend","notfall","rohes fleisch","handschuhe",
+        "sofort","kritisch","skandal",
+    ]):
+        urgency = "critical"
+    elif any(w in c for w in ["schnell","bald","wichtig","unverzüglich"]):
+        urgency = "high"
+    elif any(w in c for w in ["wenn möglich","gelegentlich"]):
+        urgency = "low"
+    else:
+        urgency = "medium"
+    return pos, neg, category, urgency
+
+
+def matcher_votes(matcher, content: str):
+    votes = matcher.votes(content)
+    matched = votes.matched_categories
+    return votes.positive, votes.negative, matched[0] if matched else "suggestion", votes.urgency_level
+
+
+def best_of(repeat: int, fn, docs) -> float:
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for d in docs:
+            fn(d)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--kind", choices=feedback_corpus.KINDS, default=None, help="Nur eine Dokumentart")
+    parser.add_argument("--tenant", default=None, help="Tenant/Template, dessen urgency_rules dazukommen")
+    parser.add_argument("--repeat", type=int, default=5, help="Bester von N Durchläufen")
+    args = parser.parse_args()
+
+    if check_classifier_cases():
+        sys.exit(1)
+
+    kinds = (args.kind,) if args.kind else feedback_corpus.KINDS
+    weights = (1,) if args.kind else feedback_corpus.DEFAULT_MIX
+    docs = [s.text for s in feedback_corpus.generate(args.docs, args.seed, kinds, weights)]
+    total_bytes = sum(len(d.encode()) for d in docs)
+
+    base = matcher_for_tenant(None)
+    mismatches = sum(reference_votes(d) != matcher_votes(base, d) for d in docs)
+    print(f"{len(docs)} Dokumente, Ø {total_bytes // len(docs)} Bytes, {base.keywords} Keywords, "
+          f"{mismatches} Abweichungen zur bisherigen Implementierung")
+
+    old = best_of(args.repeat, reference_votes, docs)
+    new = best_of(args.repeat, lambda d: matcher_votes(base, d), docs)
+    print(f"any()-Scans        {old / len(docs) * 1e6:7.1f} µs/doc")
+    print(f"Matcher            {new / len(docs) * 1e6:7.1f} µs/doc  ({old / new:.1f}×)")
+
+    if args.tenant:
+        matcher = matcher_for_tenant(args.tenant)
+        tenant = best_of(args.repeat, lambda d: matcher_votes(matcher, d), docs)
+        print(f"Matcher + Tenant   {tenant / len(docs) * 1e6:7.1f} µs/doc  ({matcher.keywords} Keywords)")
+
+
+if __name__ == "__main__":
+    main()
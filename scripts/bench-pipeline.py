@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Benchmark-Suite für Erkennung und Pseudonymisierung: Geschwindigkeit + Genauigkeit.
+
+Läuft auf dem synthetischen Korpus aus ``feedback_corpus.py`` und meldet
+
+* docs/s, MB/s, p50/p99 pro Dokument für ``detect_pii`` und ``anonymize_content``
+  (Datenbank durch eine In-Memory-Tabelle ersetzt, Hashing/Verschlüsselung echt)
+* Precision/Recall pro PII-Typ (exakter Span + Typ) und den Anteil der
+  Ground-Truth-Spans, die überhaupt maskiert wurden (unabhängig vom Typ)
+
+    python scripts/bench-pipeline.py --docs 2000 --seed 42
+    python scripts/bench-pipeline.py --tenant retail --json > before.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "..", "core"))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from cryptography.fernet import Fernet  # noqa: E402
+
+from config import settings  # noqa: E402
+import database  # noqa: E402
+from pipeline import anonymizer  # noqa: E402
+from pipeline import keys  # noqa: E402
+from pipeline.detector import detect_pii  # noqa: E402
+from pipeline.pseudonym_cache import pseudonym_cache  # noqa: E402
+import feedback_corpus  # noqa: E402
+
+logging.disable(logging.INFO)
+
+
+class MemoryDB:
+    """
+    In-Memory-Ersatz für die ``pseudonym_mapping``- und ``tenant_keys``-Zugriffe.
+
+    Kennt nur die Statements, die der Anonymizer tatsächlich absetzt; ändern
+    sich diese, schlägt der Benchmark laut fehl statt still falsch zu messen.
+    """
+
+    def __init__(self):
+        self.rows: Dict[tuple, dict] = {}
+        self.keys: Dict[tuple, str] = {}
+        self.connections = 0
+        self.statements = 0
+
+    @asynccontextmanager
+    async def connection(self):
+        """Ersatz für ``database.connection`` (Pool-Ausleihe)."""
+        self.connections += 1
+        yield _AsyncMemoryConnection(self)
+
+
+class _AsyncMemoryConnection:
+    def __init__(self, db: MemoryDB):
+        self.db = db
+
+    def cursor(self):
+        return _AsyncMemoryCursor(self.db)
+
+
+class _MemoryCursor:
+    def __init__(self, db: MemoryDB):
+        self.db = db
+        self.result: List[dict] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql: str, params=()):
+        self.db.statements += 1
+        statement = " ".join(sql.split())
+        if statement.startswith(
+            "SELECT original_hash, pseudonym FROM pseudonym_mapping WHERE tenant_id = %s AND original_hash = ANY(%s)"
+        ):
+            tenant_id, hashes = params
+            self.result = [
+                {"original_hash": h, "pseudonym": self.db.rows[(tenant_id, h)]["pseudonym"]}
+                for h in hashes if (tenant_id, h) in self.db.rows
+            ]
+        elif statement.startswith("INSERT INTO pseudonym_mapping") and "RETURNING original_hash, pseudonym" in statement:
+            # Multi-Row-INSERT … ON CONFLICT DO UPDATE (No-op) RETURNING
+            self.result = []
+            for i in range(0, len(params), 6):
+                tenant_id, original_hash, pseudonym, pii_type, encrypted_original, key_version = params[i:i + 6]
+                row = self.db.rows.setdefault((tenant_id, original_hash), {
+                    "pseudonym": pseudonym, "pii_type": pii_type,
+                    "encrypted_original": encrypted_original, "key_version": key_version,
+                })
+                self.result.append({"original_hash": original_hash, "pseudonym": row["pseudonym"]})
+        elif statement.startswith("SELECT key_version, wrapped_key FROM tenant_keys WHERE tenant_id = %s"):
+            versions = sorted((v, w) for (t, v), w in self.db.keys.items() if t == params[0])
+            self.result = [{"key_version": v, "wrapped_key": w} for v, w in versions[-1:]]
+        elif statement.startswith("INSERT INTO tenant_keys"):
+            tenant_id, key_version, wrapped_key = params
+            self.result = [{"wrapped_key": self.db.keys.setdefault((tenant_id, key_version), wrapped_key)}]
+        else:
+            raise NotImplementedError(f"MemoryDB kennt dieses Statement nicht: {statement[:80]}")
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+class _AsyncMemoryCursor(_MemoryCursor):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql: str, params=()):
+        super().execute(sql, params)
+
+    async def fetchone(self):
+        return super().fetchone()
+
+    async def fetchall(self):
+        return super().fetchall()
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def _timing(latencies: List[float], total_bytes: int) -> Dict[str, float]:
+    total = sum(latencies)
+    ordered = sorted(latencies)
+    return {
+        "docs_per_s": len(latencies) / total if total else 0.0,
+        "mb_per_s": total_bytes / total / 1e6 if total else 0.0,
+        "p50_ms": _percentile(ordered, 50) * 1000,
+        "p99_ms": _percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+
+
+def accuracy(samples, results) -> Dict[str, Dict[str, float]]:
+    """
+    Precision/Recall pro Typ (exakter Span) und Maskierungsquote.
+
+    Returns:
+        Typ → {tp, fp, fn, precision, recall}; Schlüssel ``_masked`` enthält
+        den Anteil der Ground-Truth-Spans, die vollständig von irgendeiner
+        Erkennung abgedeckt sind
+    """
+    counts = defaultdict(lambda: {"tp": 0, "fp": 0, "fn": 0})
+    masked = total = 0
+    for sample, detections in zip(samples, results):
+        truth = set(sample.spans)
+        found = {(d.type, d.start, d.end) for d in detections}
+        for pii_type, _, _ in truth & found:
+            counts[pii_type]["tp"] += 1
+        for pii_type, _, _ in found - truth:
+            counts[pii_type]["fp"] += 1
+        for pii_type, _, _ in truth - found:
+            counts[pii_type]["fn"] += 1
+
+        covered = sorted((d.start, d.end) for d in detections)
+        for _, start, end in truth:
+            total += 1
+            pos = start
+            for d_start, d_end in covered:
+                if d_start <= pos < d_end:
+                    pos = d_end
+                if pos >= end:
+                    break
+            masked += pos >= end
+
+    report = {}
+    for pii_type, c in sorted(counts.items()):
+        tp, fp, fn = c["tp"], c["fp"], c["fn"]
+        report[pii_type] = {
+            **c,
+            "precision": tp / (tp + fp) if tp + fp else 1.0,
+            "recall": tp / (tp + fn) if tp + fn else 1.0,
+        }
+    report["_masked"] = {"spans": total, "masked": masked, "ratio": masked / total if total else 1.0}
+    return report
+
+
+async def _anonymize_all(texts, results, tenant_id: str, latencies: List[float]):
+    for i, (text, detections) in enumerate(zip(texts, results)):
+        start = time.perf_counter()
+        await anonymizer.anonymize_content(text, detections, tenant_id)
+        latencies[i] = min(latencies[i], time.perf_counter() - start)
+
+
+def run(samples, repeat: int, tenant_id: str) -> Dict[str, object]:
+    texts = [s.text for s in samples]
+    total_bytes = sum(len(t.encode()) for t in texts)
+
+    # Pro Dokument die beste von N Messungen (das System ist verrauscht)
+    detect_lat = [float("inf")] * len(texts)
+    anon_lat = [float("inf")] * len(texts)
+    warm_lat = [float("inf")] * len(texts)
+    results = []
+    for _ in range(repeat):
+        results = []
+        for i, text in enumerate(texts):
+            start = time.perf_counter()
+            results.append(detect_pii(text, tenant_id))
+            detect_lat[i] = min(detect_lat[i], time.perf_counter() - start)
+
+        # Frische Tabelle + leerer Cache pro Durchlauf: misst den Schreibpfad
+        # (neue Pseudonyme); der zweite Durchlauf den Pfad wiederkehrender Absender
+        db = MemoryDB()
+        database.connection = db.connection
+        keys.keyring.forget()
+        pseudonym_cache.clear()
+        asyncio.run(_anonymize_all(texts, results, tenant_id, anon_lat))
+        cold_connections, cold_statements = db.connections, db.statements
+        asyncio.run(_anonymize_all(texts, results, tenant_id, warm_lat))
+
+    return {
+        "docs": len(texts),
+        "avg_bytes": total_bytes // max(1, len(texts)),
+        "detect": _timing(detect_lat, total_bytes),
+        "anonymize": _timing(anon_lat, total_bytes),
+        "anonymize_warm": _timing(warm_lat, total_bytes),
+        "pseudonym_rows": len(db.rows),
+        "db_connections": cold_connections,
+        "db_statements": cold_statements,
+        "db_connections_warm": db.connections - cold_connections,
+        "pseudonym_cache": pseudonym_cache.stats(),
+        "accuracy": accuracy(samples, results),
+    }
+
+
+def print_report(report: Dict[str, object]):
+    print(f"{report['docs']} Dokumente, Ø {report['avg_bytes']} Bytes")
+    for stage in ("detect", "anonymize", "anonymize_warm"):
+        t = report[stage]
+        print(
+            f"  {stage:14} {t['docs_per_s']:9.1f} docs/s  {t['mb_per_s']:6.2f} MB/s  "
+            f"p50 {t['p50_ms']:7.2f} ms  p99 {t['p99_ms']:7.2f} ms  max {t['max_ms']:7.2f} ms"
+        )
+    print(
+        f"  pseudonym_mapping-Zeilen: {report['pseudonym_rows']}, "
+        f"DB-Verbindungen: {report['db_connections']}, Statements: {report['db_statements']}, "
+        f"DB-Verbindungen (warm): {report['db_connections_warm']}"
+    )
+    cache = report["pseudonym_cache"]
+    print(f"  Pseudonym-Cache: {cache['size']} Einträge, Hit-Rate {cache['hit_rate']:.3f}")
+    print()
+    print(f"  {'Typ':16} {'TP':>6} {'FP':>6} {'FN':>6} {'Precision':>10} {'Recall':>8}")
+    acc = report["accuracy"]
+    for pii_type, a in acc.items():
+        if pii_type.startswith("_"):
+            continue
+        print(
+            f"  {pii_type:16} {a['tp']:6} {a['fp']:6} {a['fn']:6} "
+            f"{a['precision']:10.3f} {a['recall']:8.3f}"
+        )
+    m = acc["_masked"]
+    print(f"\n  Maskiert (beliebiger Typ): {m['masked']}/{m['spans']} = {m['ratio']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--kind", choices=feedback_corpus.KINDS, default=None, help="Nur eine Dokumentart")
+    parser.add_argument("--repeat", type=int, default=3, help="Bester von N Durchläufen pro Dokument")
+    parser.add_argument("--tenant", default=None, help="Tenant-ID (Template-Profil)")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args()
+
+    try:
+        Fernet(settings.encryption_key.encode())
+    except ValueError:
+        settings.encryption_key = Fernet.generate_key().decode()
+
+    kinds = (args.kind,) if args.kind else feedback_corpus.KINDS
+    weights = (1,) if args.kind else feedback_corpus.DEFAULT_MIX
+    samples = feedback_corpus.generate(args.docs, args.seed, kinds, weights)
+    report = run(samples, args.repeat, args.tenant)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Synthetischer AT/DE-Feedback-Korpus mit Ground-Truth-PII-Spans.
+
+Reproduzierbar über den Seed. Strukturierte Werte (IBAN, Kreditkarte, SVNR)
+haben gültige Prüfziffern; dazu kommen Köder ohne PII (Bestellnummern,
+Preise, Datumsangaben), die als False Positives zählen, wenn sie erkannt werden.
+
+    python scripts/feedback_corpus.py --docs 5 --seed 1      # Beispiele ausgeben
+"""
+import argparse
+import random
+from typing import List, NamedTuple, Tuple
+
+FIRST = ["Max", "Anna", "Maria", "Thomas", "Lisa", "Günter", "Jürgen", "Eva", "Stefan", "Katharina",
+         "Michael", "Julia", "Andreas", "Sabine", "Lukas", "Sophie"]
+LAST = ["Mustermann", "Schneider", "Fink", "Huber", "Gruber", "Wagner", "Pichler", "Steiner",
+        "Moser", "Mayer", "Bauer", "Winkler", "Eder", "Berger"]
+PLACES = [("6850", "Dornbirn"), ("6900", "Bregenz"), ("1010", "Wien"), ("8010", "Graz"),
+          ("4020", "Linz"), ("5020", "Salzburg"), ("6020", "Innsbruck"), ("9020", "Klagenfurt")]
+STREETS = ["Marktstraße", "Bahnhofstraße", "Kirchgasse", "Hauptplatz", "Lindenweg", "Schillerallee"]
+MAIL_DOMAINS = ["gmx.at", "gmail.com", "aon.at", "icloud.com", "web.de"]
+
+GREETINGS = ["Sehr geehrte Damen und Herren,", "Grüß Gott,", "Hallo zusammen,", "Guten Tag,"]
+COMPLAINTS = [
+    "Meine Bestellung ist leider nicht angekommen.",
+    "Im Markt hat ein Mitarbeiter ohne Handschuhe rohes Fleisch angefasst.",
+    "Die Ware war beschädigt, ich möchte mein Geld zurück.",
+    "Ich warte seit drei Wochen auf eine Rückmeldung.",
+    "Die Abrechnung ist viel zu hoch ausgefallen.",
+    "Seit gestern haben wir keinen Strom.",
+]
+QUESTIONS = [
+    "Führt ihr Dinkelmehl auch online?",
+    "Kann ich den Vertrag vorzeitig kündigen?",
+    "Gibt es die Äpfel auch in Bio-Qualität?",
+]
+PRAISE = [
+    "Super Service, danke!",
+    "Die Verkäuferin in der Filiale war sehr nett und hilfsbereit.",
+    "Tolle Auswahl an regionalen Produkten, weiter so!",
+    "Schnelle Lieferung und alles bestens verpackt.",
+    "Sehr zufrieden, gerne wieder.",
+]
+
+KINDS = ("praise", "complaint", "thread", "list")
+DEFAULT_MIX = (0.45, 0.35, 0.12, 0.08)
+
+
+class Sample(NamedTuple):
+    """Ein Dokument mit Ground Truth: ``spans`` = [(pii_type, start, end), …]."""
+    kind: str
+    text: str
+    spans: List[Tuple[str, int, int]]
+
+
+class _Builder:
+    """Setzt Text zusammen und merkt sich die Positionen der PII-Werte."""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.length = 0
+        self.spans: List[Tuple[str, int, int]] = []
+
+    def text(self, s: str) -> "_Builder":
+        self.parts.append(s)
+        self.length += len(s)
+        return self
+
+    def pii(self, pii_type: str, value: str) -> "_Builder":
+        self.spans.append((pii_type, self.length, self.length + len(value)))
+        return self.text(value)
+
+    def build(self, kind: str) -> Sample:
+        return Sample(kind, "".join(self.parts), self.spans)
+
+
+# --- Werte mit gültigen Prüfziffern -------------------------------------------
+
+def iban_at(rng: random.Random) -> str:
+    bban = "".join(str(rng.randint(0, 9)) for _ in range(16))
+    numeric = bban + "1029" + "00"  # "AT" = 10 29
+    check = 98 - int(numeric) % 97
+    raw = f"AT{check:02d}{bban}"
+    return " ".join(raw[i:i + 4] for i in range(0, len(raw), 4))
+
+
+def card(rng: random.Random) -> str:
+    digits = [4] + [rng.randint(0, 9) for _ in range(14)]
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    digits.append((10 - total % 10) % 10)
+    raw = "".join(map(str, digits))
+    return " ".join(raw[i:i + 4] for i in range(0, 16, 4))
+
+
+def svnr(rng: random.Random) -> str:
+    weights = (3, 7, 9, 5, 8, 4, 2, 1, 6)
+    while True:
+        serial = [rng.randint(1, 9)] + [rng.randint(0, 9) for _ in range(2)]
+        birth = [int(c) for c in f"{rng.randint(1, 28):02d}{rng.randint(1, 12):02d}{rng.randint(40, 99):02d}"]
+        check = sum(d * w for d, w in zip(serial + birth, weights)) % 11
+        if check != 10:
+            return "".join(map(str, serial)) + str(check) + " " + "".join(map(str, birth))
+
+
+def phone_at(rng: random.Random) -> str:
+    fmt = rng.choice(["0664/{a}{b}", "+43 664 {a} {b}", "0676 {a} {b}"])
+    return fmt.format(a=rng.randint(100, 999), b=rng.randint(1000, 9999))
+
+
+def phone_de(rng: random.Random) -> str:
+    return f"+49 {rng.randint(30, 89)} {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}"
+
+
+def email(rng: random.Random, first: str, last: str) -> str:
+    local = rng.choice([f"{first}.{last}", f"{first[0]}.{last}", f"{last}{rng.randint(1, 99)}"])
+    local = local.lower().replace("ü", "ue").replace("ö", "oe").replace("ä", "ae")
+    return f"{local}@{rng.choice(MAIL_DOMAINS)}"
+
+
+def ip_address(rng: random.Random) -> str:
+    return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+
+
+# --- Bausteine -------------------------------------------------------------------
+
+def _decoy(b: _Builder, rng: random.Random):
+    """Zahlen ohne PII-Bezug."""
+    choice = rng.randrange(4)
+    if choice == 0:
+        b.text(f" Bestellnummer {rng.randint(1000000000, 9999999999)}.")
+    elif choice == 1:
+        b.text(f" Mir wurden {rng.randint(1, 99)},{rng.randint(10, 99)}€ zu viel verrechnet.")
+    elif choice == 2:
+        b.text(f" Lieferung am {rng.randint(1, 28)}.{rng.randint(1, 12)}.2024 erwartet.")
+    else:
+        b.text(f" Kundennummer KD-{rng.randint(10000, 99999)}.")
+
+
+def _signature(b: _Builder, rng: random.Random):
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    plz, place = rng.choice(PLACES)
+    b.text("\nMit freundlichen Grüßen\n").pii("full_name", f"{first} {last}").text("\n")
+    b.pii("address", f"{rng.choice(STREETS)} {rng.randint(1, 99)}").text(", ")
+    b.pii("postal_code_at", plz).text(" ").pii("place", place).text("\nTel: ")
+    b.pii("phone_at", phone_at(rng)).text("\n").pii("email", email(rng, first, last)).text("\n")
+
+
+def _complaint_body(b: _Builder, rng: random.Random):
+    b.text(rng.choice(GREETINGS) + "\n")
+    for _ in range(rng.randint(2, 5)):
+        b.text(rng.choice(COMPLAINTS + QUESTIONS) + " ")
+    extra = rng.randrange(6)
+    if extra == 0:
+        b.text("Bitte überweisen Sie den Betrag auf ").pii("iban", iban_at(rng)).text(". ")
+    elif extra == 1:
+        b.text("Bezahlt habe ich mit der Karte ").pii("credit_card", card(rng)).text(". ")
+    elif extra == 2:
+        b.text("Meine Versicherungsnummer ist ").pii("austrian_ssn", svnr(rng)).text(". ")
+    elif extra == 3:
+        b.text("Erreichbar bin ich unter ").pii("phone_de", phone_de(rng)).text(". ")
+    elif extra == 4:
+        b.text("Der Fehler kam von der Adresse ").pii("ip_address", ip_address(rng)).text(". ")
+    if rng.random() < 0.5:
+        _decoy(b, rng)
+
+
+def praise(rng: random.Random) -> Sample:
+    b = _Builder()
+    b.text(" ".join(rng.sample(PRAISE, rng.randint(1, 3))))
+    if rng.random() < 0.2:
+        b.text(" Liebe Grüße, ").pii("first_name", rng.choice(FIRST))
+    return b.build("praise")
+
+
+def complaint(rng: random.Random) -> Sample:
+    b = _Builder()
+    _complaint_body(b, rng)
+    _signature(b, rng)
+    return b.build("complaint")
+
+
+def thread(rng: random.Random, replies: int = 8) -> Sample:
+    """Weitergeleiteter Mail-Thread mit Zitaten und Signaturen."""
+    b = _Builder()
+    for _ in range(replies):
+        _complaint_body(b, rng)
+        _signature(b, rng)
+        b.text("-----Ursprüngliche Nachricht-----\nVon: Herr ").pii("last_name", rng.choice(LAST)).text("\n")
+    return b.build("thread")
+
+
+def contact_list(rng: random.Random, rows: int = 200) -> Sample:
+    """CSV-Export mit mehreren PII-Werten pro Zeile."""
+    b = _Builder()
+    b.text("Name;E-Mail;Telefon;IBAN\n")
+    for _ in range(rows):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        b.pii("full_name", f"{first} {last}").text(";").pii("email", email(rng, first, last)).text(";")
+        b.pii("phone_at", phone_at(rng)).text(";").pii("iban", iban_at(rng)).text("\n")
+    return b.build("list")
+
+
+GENERATORS = {"praise": praise, "complaint": complaint, "thread": thread, "list": contact_list}
+
+
+def generate(n: int, seed: int = 42, kinds: Tuple[str, ...] = KINDS, weights=DEFAULT_MIX) -> List[Sample]:
+    """
+    Erzeugt ``n`` Dokumente, reproduzierbar über ``seed``.
+
+    Args:
+        n: Anzahl Dokumente
+        seed: Zufalls-Seed
+        kinds: Dokumentarten (siehe ``GENERATORS``)
+        weights: Mischverhältnis passend zu ``kinds``
+
+    Returns:
+        Liste von ``Sample`` mit Text und Ground-Truth-Spans
+    """
+    rng = random.Random(seed)
+    return [GENERATORS[kind](rng) for kind in rng.choices(kinds, weights=weights, k=n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gibt Beispiel-Dokumente mit Ground Truth aus.")
+    parser.add_argument("--docs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--kind", choices=KINDS, default=None)
+    args = parser.parse_args()
+
+    kinds = (args.kind,) if args.kind else KINDS
+    weights = (1,) if args.kind else DEFAULT_MIX
+    for sample in generate(args.docs, args.seed, kinds, weights):
+        print(f"=== {sample.kind} ({len(sample.text)} Zeichen) ===")
+        print(sample.text)
+        for pii_type, start, end in sample.spans:
+            print(f"  {pii_type:15} {sample.text[start:end]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Rotiert den Datenschlüssel eines Tenants und verschlüsselt dessen Pseudonym-Mappings neu.
+
+Läuft neben dem Ingest (kleine Batches, SKIP LOCKED) und ist fortsetzbar:
+
+    python scripts/rotate-tenant-key.py demo
+    python scripts/rotate-tenant-key.py demo --resume      # abgebrochenen Lauf fortsetzen
+
+Master-Key rotieren: neuen Key vorne in ``ENCRYPTION_KEY`` eintragen (alter
+Key bleibt dahinter), Dienste neu starten, dann alle Datenschlüssel neu
+verpacken; erst danach den alten Key entfernen:
+
+    python scripts/rotate-tenant-key.py --rewrap-master
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "core"))
+
+import database  # noqa: E402
+from pipeline.keys import rewrap_data_keys  # noqa: E402
+from pipeline.reencrypt import reencrypt_tenant  # noqa: E402
+
+
+async def _run(args) -> dict:
+    await database.open_pool()
+    try:
+        if args.rewrap_master:
+            return await rewrap_data_keys()
+        return await reencrypt_tenant(
+            args.tenant_id, rotate=not args.resume, batch_size=args.batch_size, pause=args.pause
+        )
+    finally:
+        await database.close_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tenant_id", nargs="?")
+    parser.add_argument(
+        "--rewrap-master", action="store_true",
+        help="Datenschlüssel aller Tenants mit dem ersten Key aus ENCRYPTION_KEY neu verpacken"
+    )
+    parser.add_argument("--resume", action="store_true", help="Keine neue Version anlegen, nur Rest neu verschlüsseln")
+    parser.add_argument("--batch-size", type=int, default=None, help="Zeilen pro Transaktion")
+    parser.add_argument("--pause", type=float, default=None, help="Pause zwischen Batches in Sekunden")
+    args = parser.parse_args()
+    if args.rewrap_master == bool(args.tenant_id):
+        parser.error("entweder tenant_id oder --rewrap-master angeben")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    stats = asyncio.run(_run(args))
+    print(json.dumps(stats, indent=2))
+    sys.exit(1 if stats.get("pending") else 0)
+
+
+if __name__ == "__main__":
+    main()